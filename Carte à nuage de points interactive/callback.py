@@ -2,6 +2,7 @@
     This file contains the functions to call when
     a click is detected on the map, depending on the context
 '''
+import dash
 import dash_html_components as html
 
 
@@ -39,15 +40,17 @@ def map_base_clicked(title, mode, theme, style):
             style: The updated display style for the panel
     '''
     # TODO : Handle clicks on the map base
-    return title, mode, theme, style
+    # Nothing changes, so nothing is sent back to the browser
+    return dash.no_update, dash.no_update, dash.no_update, dash.no_update
 
 
-def map_marker_clicked(figure, curve, point, title, mode, theme, style): 
+def map_marker_clicked(registry, curve, point, title, mode, theme, style): 
     '''
         Deals with the case where a marker is clicked
 
         Args:
-            figure: The current figure
+            registry: The details of the markers, as given
+                by 'map_viz.get_marker_registry'
             curve: The index of the curve containing the clicked marker
             point: The index of the clicked marker
             title: The current display title
@@ -62,18 +65,23 @@ def map_marker_clicked(figure, curve, point, title, mode, theme, style):
     '''
     # TODO : Handle clicks on the markers
     
-  # Retrieve the title text from the clicked marker's custom data
-    clicked_title = figure['data'][curve]['customdata'][0][point]
+    # The registry is empty when the paths are drawn as clusters or as
+    # a density layer, so clicking them is the same as clicking the map base
+    if (curve, point) not in registry:
+        return map_base_clicked(title, mode, theme, style)
+
+    # Retrieve the details of the clicked marker from the registry
+    marker = registry[(curve, point)]
 
     # Create a Dash HTML Div for the title with marker color styling
     updated_title = html.Div(
-        clicked_title,
-        style={'color': figure['data'][curve]['marker']['color']}
+        marker['title'],
+        style={'color': marker['color']}
     )
 
     # Extract the mode and theme info linked to the clicked marker
-    updated_mode = figure['data'][curve]['customdata'][2][point]
-    theme_text = figure['data'][curve]['customdata'][1][point]
+    updated_mode = marker['mode']
+    theme_text = marker['theme']
 
     # If theme exists, convert it into an HTML list
     if theme_text:
@@ -91,4 +99,8 @@ def map_marker_clicked(figure, curve, point, title, mode, theme, style):
         'padding': '10px'
     }
 
+    # Only send the style if the panel is not styled already
+    if style == updated_style:
+        updated_style = dash.no_update
+
     return updated_title, updated_mode, updated_theme, updated_style
\ No newline at end of file
@@ -0,0 +1,93 @@
+'''
+    Contains the functions to group the pedestrian paths into clusters,
+    so large numbers of paths can be displayed on the map.
+
+    At each zoom level of the map, the paths of each type of
+    intervention are grouped by cells of a grid whose size on the
+    screen is about the same at every zoom level.
+'''
+import numpy as np
+
+# The zoom levels of the map for which the clusters are computed
+ZOOM_LEVELS = range(8, 17)
+# The size of the cells of the grid, in pixels on the screen
+CELL_SIZE = 60
+# The size in pixels of a tile of the map at zoom level 0
+TILE_SIZE = 256
+
+
+def get_cell_size(zoom):
+    '''
+        Gets the size of the cells of the grid at the given zoom level.
+
+        Args:
+            zoom: The zoom level of the map
+        Returns:
+            The size of the cells, in degrees
+    '''
+    # At zoom level 'zoom', the 360 degrees of longitude
+    # are displayed on 2 ** zoom tiles
+    return 360 * CELL_SIZE / (TILE_SIZE * 2 ** zoom)
+
+
+def get_clusters(street_df, zoom):
+    '''
+        Groups the pedestrian paths of each type of intervention
+        by the cells of the grid at the given zoom level.
+
+        Args:
+            street_df: The dataframe containing the information on the
+                pedestrian paths, as given by 'preprocess.sort_df'
+            zoom: The zoom level of the map
+        Returns:
+            A dataframe with a row per cluster and the columns
+            'properties.TYPE_SITE_INTERVENTION', 'properties.LATITUDE'
+            and 'properties.LONGITUDE', the latter two being the mean
+            position of the paths of the cluster, and 'Count', the
+            number of paths in the cluster
+    '''
+    cell_size = get_cell_size(zoom)
+    cells = street_df.assign(
+        Row=np.floor(street_df['properties.LATITUDE'] / cell_size).astype(int),
+        Column=np.floor(street_df['properties.LONGITUDE'] / cell_size).astype(int))
+
+    return cells.groupby(
+        ['properties.TYPE_SITE_INTERVENTION', 'Row', 'Column'], observed=True, sort=True
+    ).agg(**{
+        'properties.LATITUDE': ('properties.LATITUDE', 'mean'),
+        'properties.LONGITUDE': ('properties.LONGITUDE', 'mean'),
+        'Count': ('properties.LATITUDE', 'size')
+    }).reset_index().drop(columns=['Row', 'Column'])
+
+
+def get_cluster_levels(street_df, zooms=ZOOM_LEVELS):
+    '''
+        Computes the clusters of the pedestrian paths once for
+        every zoom level, so they are not grouped again when
+        the map is zoomed.
+
+        Args:
+            street_df: The dataframe containing the information on the
+                pedestrian paths, as given by 'preprocess.sort_df'
+            zooms: The zoom levels to compute the clusters for
+        Returns:
+            A dictionary mapping each zoom level to its clusters,
+            as given by 'get_clusters'
+    '''
+    return {zoom: get_clusters(street_df, zoom) for zoom in zooms}
+
+
+def get_closest_level(cluster_levels, zoom):
+    '''
+        Gets the clusters computed for the zoom level
+        closest to the given one.
+
+        Args:
+            cluster_levels: The clusters per zoom level, as
+                given by 'get_cluster_levels'
+            zoom: The zoom level of the map, which may not be an integer
+        Returns:
+            The clusters of the closest zoom level
+    '''
+    closest = min(cluster_levels, key=lambda level: abs(level - zoom))
+    return cluster_levels[closest]
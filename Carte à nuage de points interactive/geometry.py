@@ -0,0 +1,184 @@
+'''
+    Contains the functions to simplify the geometry of the base map.
+
+    The polygons of the neighborhoods are simplified with the
+    Douglas-Peucker algorithm and their coordinates are rounded,
+    then the simplified GeoJSON is saved in the assets, so it is
+    downloaded by the browser instead of being embedded in the figure.
+'''
+import glob
+import json
+import os
+
+import numpy as np
+
+import cache
+import preprocess
+
+GEOMETRY_DIR = './assets/cache'
+GEOMETRY_URL = '/assets/cache'
+
+# The tolerance is in degrees, 0.0001 being about 10 meters in Montreal
+TOLERANCE = 0.0001
+# The number of decimals kept in the coordinates, 5 being about a meter
+PRECISION = 5
+# The properties of the neighborhoods used by the map
+PROPERTIES = ('NOM',)
+
+
+def simplify_line(points, tolerance):
+    '''
+        Simplifies a line with the Douglas-Peucker algorithm, removing
+        the points closer to the simplified line than the tolerance.
+
+        Args:
+            points: The points of the line, as an array of shape (N, 2)
+            tolerance: The maximum distance between the line and
+                its simplification
+        Returns:
+            The points of the simplified line
+    '''
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+
+    # Split the line at its farthest point from the segment joining
+    # its ends until every point is close enough to a segment
+    stack = [(0, len(points) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+
+        segment = points[end] - points[start]
+        offsets = points[start + 1:end] - points[start]
+        length = np.hypot(segment[0], segment[1])
+        if length == 0:
+            # The line is closed, so the distance is to its start
+            distances = np.hypot(offsets[:, 0], offsets[:, 1])
+        else:
+            distances = np.abs(segment[0] * offsets[:, 1] - segment[1] * offsets[:, 0]) / length
+
+        farthest = np.argmax(distances)
+        if distances[farthest] > tolerance:
+            middle = start + 1 + farthest
+            keep[middle] = True
+            stack.append((start, middle))
+            stack.append((middle, end))
+
+    return points[keep]
+
+
+def simplify_ring(ring, tolerance, precision):
+    '''
+        Simplifies a ring of a polygon and rounds its coordinates.
+
+        A ring is kept as it is if its simplification would
+        not be a polygon anymore.
+
+        Args:
+            ring: The coordinates of the ring
+            tolerance: The tolerance of the simplification
+            precision: The number of decimals to keep
+        Returns:
+            The coordinates of the simplified ring
+    '''
+    points = np.round(np.asarray(ring, dtype=float)[:, :2], precision)
+
+    # Remove the points which became duplicates once rounded
+    distinct = np.ones(len(points), dtype=bool)
+    distinct[1:] = np.any(points[1:] != points[:-1], axis=1)
+    points = points[distinct]
+
+    simplified = simplify_line(points, tolerance)
+    if len(simplified) < 4:
+        simplified = points
+    return simplified.tolist()
+
+
+def simplify_geometry(geometry, tolerance, precision):
+    '''
+        Simplifies a Polygon or MultiPolygon geometry. The
+        other types of geometries are returned as they are.
+
+        Args:
+            geometry: The GeoJSON geometry
+            tolerance: The tolerance of the simplification
+            precision: The number of decimals to keep
+        Returns:
+            The simplified geometry
+    '''
+    if geometry['type'] == 'Polygon':
+        coordinates = [
+            simplify_ring(ring, tolerance, precision)
+            for ring in geometry['coordinates']
+        ]
+    elif geometry['type'] == 'MultiPolygon':
+        coordinates = [
+            [simplify_ring(ring, tolerance, precision) for ring in polygon]
+            for polygon in geometry['coordinates']
+        ]
+    else:
+        return geometry
+    return dict(type=geometry['type'], coordinates=coordinates)
+
+
+def simplify_geojson(data, tolerance=TOLERANCE, precision=PRECISION, properties=PROPERTIES):
+    '''
+        Simplifies the geometry of every feature of a GeoJSON
+        feature collection, and keeps only the given properties.
+
+        Args:
+            data: The GeoJSON feature collection
+            tolerance: The tolerance of the simplification
+            precision: The number of decimals to keep
+            properties: The names of the properties to keep
+        Returns:
+            The simplified feature collection
+    '''
+    return dict(type='FeatureCollection', features=[
+        dict(
+            type='Feature',
+            properties={name: feature['properties'].get(name) for name in properties},
+            geometry=simplify_geometry(feature['geometry'], tolerance, precision)
+        )
+        for feature in data['features']
+    ])
+
+
+def get_geojson_url(path=preprocess.MONTREAL_PATH, tolerance=TOLERANCE, precision=PRECISION):
+    '''
+        Gets the URL of the simplified version of the given GeoJSON
+        file, to be used as the 'geojson' of the choropleth trace.
+
+        The simplified file is saved in the assets and named after
+        the hash of the source file and the parameters of the
+        simplification, so it is only computed again when they
+        change. Previous versions of the file are deleted.
+
+        Args:
+            path: The path to the GeoJSON file
+            tolerance: The tolerance of the simplification
+            precision: The number of decimals to keep
+        Returns:
+            The URL of the simplified GeoJSON file
+    '''
+    name = os.path.splitext(os.path.basename(path))[0]
+    file_hash = cache.get_file_hash(path)[:16]
+    file_name = f'{name}.{file_hash}.{tolerance:g}.{precision}.json'
+    geometry_path = os.path.join(GEOMETRY_DIR, file_name)
+
+    if not os.path.exists(geometry_path):
+        with open(path, encoding='utf-8') as data_file:
+            simplified = simplify_geojson(json.load(data_file), tolerance, precision)
+
+        os.makedirs(GEOMETRY_DIR, exist_ok=True)
+        for stale_path in glob.glob(os.path.join(GEOMETRY_DIR, f'{name}.*.json')):
+            os.remove(stale_path)
+
+        # Write to a temporary file first, so the file is never served partially
+        temp_path = f'{geometry_path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as geometry_file:
+            json.dump(simplified, geometry_file, ensure_ascii=False, separators=(',', ':'))
+        os.replace(temp_path, geometry_path)
+
+    return f'{GEOMETRY_URL}/{file_name}'
@@ -28,4 +28,20 @@ def map_marker_hover_template(name):
             The hover template.
     '''
     # TODO : Generate the hover template
-    return f'<span style="font-family:Oswald">{name}</span><extra></extra>'
\ No newline at end of file
+    return f'<span style="font-family:Oswald">{name}</span><extra></extra>'
+
+
+def map_cluster_hover_template(name):
+    '''
+        Sets the template for the hover tooltips on the clusters.
+
+        The label is the name of the walking paths in font 'Oswald',
+        followed by the number of paths in the cluster.
+
+        Args:
+            name: The name to display
+        Returns:
+            The hover template.
+    '''
+    return (f'<span style="font-family:Oswald">{name}</span><br>'
+            '<span style="font-family:Oswald">%{customdata} sites</span><extra></extra>')
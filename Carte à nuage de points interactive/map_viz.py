@@ -3,11 +3,21 @@
 
 '''
 
+import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
 
+import clusters
 import hover_template as hover
 
+# Above this number of pedestrian paths, they are displayed as
+# clusters or as a density layer instead of individual markers
+MARKER_THRESHOLD = 1000
+# The number of pixels added to the size of a cluster when its count doubles
+CLUSTER_SIZE_STEP = 4
+# The radius of influence of each pedestrian path in the density layer
+DENSITY_RADIUS = 15
+
 COLOR_TEMPLATE = {
     'Noyau villageois': px.colors.qualitative.Plotly[0],
     'Passage entre rues résidentielles': px.colors.qualitative.Plotly[1],
@@ -17,6 +27,22 @@ COLOR_TEMPLATE = {
     'Rue entre un parc et un bâtiment public ou institutionnel': px.colors.qualitative.Plotly[5],
     'Rue transversale à une rue commerciale': px.colors.qualitative.Plotly[6],
 }
+
+
+def group_interventions(street_df):
+    '''
+        Groups the pedestrian paths by type of intervention,
+        with one scatter trace drawn per group.
+
+        Args:
+            street_df: The dataframe containing the information on the
+                pedestrian paths to display
+        Returns:
+            The groups, in the order of their traces
+    '''
+    return street_df.groupby('properties.TYPE_SITE_INTERVENTION', observed=True)
+
+
 def add_choro_trace(fig, montreal_data, locations, z_vals, colorscale):
     '''
         Adds the choropleth trace, representing Montreal's neighborhoods.
@@ -29,7 +55,8 @@ def add_choro_trace(fig, montreal_data, locations, z_vals, colorscale):
 
         Args:
             fig: The figure to add the choropleth trace to
-            montreal_data: The data used for the trace
+            montreal_data: The data used for the trace, or the URL
+                of the data, such as given by 'geometry.get_geojson_url'
             locations: The locations (neighborhoods) to show on the trace
             z_vals: The table to use for the choropleth's z values
             colorscale: The table to use for the choropleth's color scale
@@ -59,7 +86,8 @@ def add_scatter_traces(fig, street_df):
     '''
         Adds the scatter trace, representing Montreal's pedestrian paths.
 
-        The marker size should be 20.
+        The marker size should be 20. The details of the markers are
+        not sent to the browser, they are given by 'get_marker_registry'.
 
         Args:
             fig: The figure to add the scatter trace to
@@ -70,9 +98,7 @@ def add_scatter_traces(fig, street_df):
 
     '''
     # TODO : Add the scatter markers to the map base
-    interventions = street_df.groupby('properties.TYPE_SITE_INTERVENTION')
-
-    for name, data in interventions :
+    for name, data in group_interventions(street_df):
         fig.add_trace(
             go.Scattermapbox(
                 name=name,
@@ -84,12 +110,130 @@ def add_scatter_traces(fig, street_df):
                     color=COLOR_TEMPLATE[name]
                 ),
                 hovertemplate=hover.map_marker_hover_template(name),
-                customdata=[
-                    data['properties.NOM_PROJET'],
-                    data['properties.OBJECTIF_THEMATIQUE'],
-                    data['properties.MODE_IMPLANTATION'],
-                ],
             )
         )
 
     return fig
+
+
+def get_marker_registry(street_df):
+    '''
+        Gets the details of every marker drawn by 'add_scatter_traces',
+        so a click on a marker can be handled on the server without
+        the figure being sent back by the browser.
+
+        The curves are numbered as in the click data of the figure,
+        the scatter traces being added after the choropleth trace.
+
+        The registry follows what 'add_street_traces' draws: when
+        there are more than 'MARKER_THRESHOLD' paths, they are drawn
+        as clusters or as a density layer, and the registry is empty.
+
+        Args:
+            street_df: The dataframe the markers were drawn from
+        Returns:
+            A dictionary mapping the curve and point number of each
+            marker to its title, color, mode and theme
+    '''
+    registry = {}
+    if len(street_df) > MARKER_THRESHOLD:
+        return registry
+
+    for curve, (name, data) in enumerate(group_interventions(street_df), start=1):
+        markers = zip(
+            data['properties.NOM_PROJET'],
+            data['properties.MODE_IMPLANTATION'],
+            data['properties.OBJECTIF_THEMATIQUE'])
+        for point, (title, mode, theme) in enumerate(markers):
+            registry[(curve, point)] = dict(
+                title=title,
+                color=COLOR_TEMPLATE[name],
+                mode=mode,
+                theme=theme
+            )
+    return registry
+
+
+def add_cluster_traces(fig, cluster_df):
+    '''
+        Adds the scatter traces representing clusters of pedestrian
+        paths, with a trace per type of intervention as for the
+        individual paths. The size of the markers grows with the
+        number of paths in the cluster.
+
+        Args:
+            fig: The figure to add the scatter traces to
+            cluster_df: The clusters to display, as given
+                by 'clusters.get_clusters'
+        Returns:
+            The figure now containing the scatter traces
+    '''
+    for name, data in group_interventions(cluster_df):
+        fig.add_trace(
+            go.Scattermapbox(
+                name=name,
+                lat=data['properties.LATITUDE'],
+                lon=data['properties.LONGITUDE'],
+                mode='markers',
+                marker=go.scattermapbox.Marker(
+                    size=20 + CLUSTER_SIZE_STEP * np.log2(data['Count']),
+                    color=COLOR_TEMPLATE[name]
+                ),
+                customdata=data['Count'],
+                hovertemplate=hover.map_cluster_hover_template(name),
+            )
+        )
+
+    return fig
+
+
+def add_density_trace(fig, street_df):
+    '''
+        Adds a density layer representing the concentration
+        of pedestrian paths, whatever their type.
+
+        Args:
+            fig: The figure to add the density trace to
+            street_df: The dataframe containing the information on the
+                pedestrian paths to display
+        Returns:
+            The figure now containing the density trace
+    '''
+    fig.add_trace(
+        go.Densitymapbox(
+            lat=street_df['properties.LATITUDE'],
+            lon=street_df['properties.LONGITUDE'],
+            radius=DENSITY_RADIUS,
+            showscale=False,
+            hoverinfo='skip',
+        )
+    )
+
+    return fig
+
+
+def add_street_traces(fig, street_df, cluster_levels, zoom, density=False):
+    '''
+        Adds the traces representing Montreal's pedestrian paths. The
+        paths are drawn as individual markers if there are at most
+        'MARKER_THRESHOLD' of them, and otherwise as clusters or as
+        a density layer.
+
+        Only the individual markers are described by 'get_marker_registry'.
+
+        Args:
+            fig: The figure to add the traces to
+            street_df: The dataframe containing the information on the
+                pedestrian paths to display
+            cluster_levels: The clusters of the paths per zoom level,
+                as given by 'clusters.get_cluster_levels'
+            zoom: The zoom level of the map
+            density: Whether to draw a density layer instead of clusters
+        Returns:
+            The figure now containing the traces
+    '''
+    if len(street_df) <= MARKER_THRESHOLD:
+        return add_scatter_traces(fig, street_df)
+    if density:
+        return add_density_trace(fig, street_df)
+    return add_cluster_traces(fig, clusters.get_closest_level(cluster_levels, zoom))
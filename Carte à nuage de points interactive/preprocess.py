@@ -1,8 +1,26 @@
 '''
     Contains some functions to preprocess the data used in the visualisation.
 '''
+import json
+
 import pandas as pd
 
+import cache
+
+STREETS_PATH = './assets/data/projetpietonnisation2017.geojson'
+MONTREAL_PATH = './assets/data/montreal.json'
+
+# The properties of the features used by the map, with their type
+STREET_PROPERTIES = {
+    'NOM_PROJET': 'object',
+    'TYPE_SITE_INTERVENTION': 'object',
+    'OBJECTIF_THEMATIQUE': 'object',
+    'MODE_IMPLANTATION': 'object',
+    'LATITUDE': 'float64',
+    'LONGITUDE': 'float64'
+}
+NEIGHBORHOOD_PROPERTIES = {'NOM': 'object'}
+
 TITLES = {
     # pylint: disable=line-too-long
     '1. Noyau villageois': 'Noyau villageois',
@@ -14,6 +32,55 @@ TITLES = {
     '7. Passage entre rues résidentielles': 'Passage entre rues résidentielles'
 }
 
+# The titles, in alphabetical order, as the categories of the interventions
+TITLE_TYPE = pd.CategoricalDtype(sorted(TITLES.values()), ordered=True)
+# The code of the title of each key of 'TITLES', in the order of the keys
+TITLE_CODES = TITLE_TYPE.categories.get_indexer(list(TITLES.values()))
+
+
+def features_to_df(features, properties):
+    '''
+        Extracts the given properties of GeoJSON features to a
+        dataframe, with a typed column per property. The other
+        properties are ignored.
+
+        Args:
+            features: The features of the GeoJSON data
+            properties: A dictionary mapping the name of each
+                property to extract to its type
+        Returns:
+            The dataframe, with the columns named 'properties.' followed
+            by the name of the property, as with 'pd.json_normalize'
+    '''
+    return pd.DataFrame({
+        f'properties.{name}': pd.Series(
+            [feature['properties'].get(name) for feature in features],
+            dtype=dtype)
+        for name, dtype in properties.items()
+    })
+
+
+def read_geojson(name, path, properties):
+    '''
+        Reads the given properties of the features of a GeoJSON
+        file. The file is parsed once, and the result is cached on
+        disk until the file changes.
+
+        Args:
+            name: The name identifying the cached dataframe
+            path: The path to the GeoJSON file
+            properties: A dictionary mapping the name of each
+                property to extract to its type
+        Returns:
+            The dataframe of the properties, as given by 'features_to_df'
+    '''
+    def build():
+        with open(path, encoding='utf-8') as data_file:
+            features = json.load(data_file)['features']
+        return features_to_df(features, properties)
+
+    return cache.cached_frame(name, path, build)
+
 
 def to_df(data):
     '''
@@ -25,7 +92,8 @@ def to_df(data):
             my_df: The corresponding dataframe
     '''
     # TODO : Convert JSON formatted data to dataframe
-    df = pd.json_normalize(data,record_path=["features"])
+    # Only the properties used by the map are extracted
+    df = features_to_df(data['features'], STREET_PROPERTIES)
     return df
 
 
@@ -34,6 +102,10 @@ def update_titles(my_df):
         Updates the column "TYPE_SITE_INTERVENTION" with corresponding
         values from the 'TITLES' dictionary (above).
 
+        The column becomes categorical, its categories being the
+        titles in alphabetical order. A KeyError is raised if a
+        value is not in the 'TITLES' dictionary.
+
         Args:
             my_df: The dataframe to update
         Returns:
@@ -41,7 +113,14 @@ def update_titles(my_df):
                 made according to the 'TITLES' dictionary
     '''
     # TODO : Update the titles
-    my_df["properties.TYPE_SITE_INTERVENTION"]=my_df["properties.TYPE_SITE_INTERVENTION"].apply(lambda x: TITLES[x])
+    # Each value is replaced through its code, instead of looking it up row by row
+    raw_titles = pd.Categorical(my_df["properties.TYPE_SITE_INTERVENTION"], categories=list(TITLES))
+    unknown = raw_titles.codes == -1
+    if unknown.any():
+        raise KeyError(my_df["properties.TYPE_SITE_INTERVENTION"][unknown].unique().tolist())
+
+    my_df["properties.TYPE_SITE_INTERVENTION"] = pd.Categorical.from_codes(
+        TITLE_CODES[raw_titles.codes], dtype=TITLE_TYPE)
     return my_df
 
 
@@ -56,7 +135,10 @@ def sort_df(my_df):
             my_df: The sorted dataframe
     '''
     # TODO : Sort the df
-    my_df = my_df.sort_values("properties.TYPE_SITE_INTERVENTION").reset_index()
+    # The categories being in alphabetical order, the codes are sorted
+    # instead of the strings. The sort is stable, so the rows of a type
+    # keep their order.
+    my_df = my_df.sort_values("properties.TYPE_SITE_INTERVENTION", kind='stable', ignore_index=True)
     return my_df
 
 
@@ -71,6 +153,42 @@ def get_neighborhoods(montreal_data):
                 neighborhoods in the data set
     '''
     # TODO : Return the array of neighborhoods
-    df = pd.json_normalize(montreal_data, record_path=["features"])
-    locations = df["properties.NOM"].tolist()
+    locations = [feature['properties']['NOM'] for feature in montreal_data['features']]
     return locations
+
+
+def load_neighborhoods(path=MONTREAL_PATH):
+    '''
+        Gets the name of the neighborhoods in the given GeoJSON
+        file, which is only parsed again when it changes.
+
+        Args:
+            path: The path to the GeoJSON file of the neighborhoods
+        Returns:
+            locations: An array containing the names of the
+                neighborhoods in the data set
+    '''
+    neighborhood_df = read_geojson('neighborhoods', path, NEIGHBORHOOD_PROPERTIES)
+    return neighborhood_df['properties.NOM'].tolist()
+
+
+def get_street_df(path=STREETS_PATH):
+    '''
+        Loads the pedestrian paths and preprocesses them with
+        'to_df', 'update_titles' and 'sort_df'. The result is
+        cached on disk until the source file changes.
+
+        Args:
+            path: The path to the GeoJSON file of the pedestrian paths
+        Returns:
+            The preprocessed dataframe
+    '''
+    def build():
+        with open(path, encoding='utf-8') as data_file:
+            street_data = json.load(data_file)
+
+        street_df = to_df(street_data)
+        street_df = update_titles(street_df)
+        return sort_df(street_df)
+
+    return cache.cached_frame('streets', path, build)
@@ -14,11 +14,9 @@
 import dash
 import dash_html_components as html
 import dash_core_components as dcc
-from dash.dependencies import Input, Output, State
+from dash.dependencies import Input, Output
 
-import pandas as pd
-
-import preprocess
+import corpus
 import bar_chart
 
 from template import create_template
@@ -31,35 +29,31 @@ app.title = 'TP2 | INF8808'
 
 def prep_data():
     '''
-        Imports the .csv file and does some preprocessing.
+        Updates the cube of the plays in the corpus and
+        splits it into the preprocessed data of each play.
 
         Returns:
-            A pandas dataframe containing the preprocessed data.
+            A dictionary mapping the name of each play to a pandas
+            dataframe containing its preprocessed data.
     '''
-    dataframe = pd.read_csv('./assets/data/romeo_and_juliet.csv')
-
-    proc_data = preprocess.summarize_lines(dataframe)
-    proc_data = preprocess.replace_others(proc_data)
-    proc_data = preprocess.clean_names(proc_data)
-    print(proc_data)
-
+    return corpus.split_plays(corpus.update_cube())
 
-    return proc_data
 
-
-def init_app_layout(figure):
+def init_app_layout(figure, plays, play):
     '''
         Generates the HTML layout representing the app.
 
         Args:
             figure: The figure to display.
+            plays: The names of the plays which can be selected.
+            play: The name of the displayed play.
         Returns:
             The HTML structure of the app's web page.
     '''
     return html.Div(className='content', children=[
         html.Header(children=[
             html.H1('Who\'s Speaking?'),
-            html.H2('An analysis of Shakespeare\'s Romeo and Juliet')
+            html.H2(get_header(play), id='play-title')
         ]),
         html.Main(children=[
             html.Div(className='viz-container', children=[
@@ -87,6 +81,15 @@ def init_app_layout(figure):
                     ])
                 ]),
                 html.Div(children=[
+                    dcc.Dropdown(
+                        id='play-dropdown',
+                        options=[
+                            dict(label=corpus.get_play_title(name), value=name)
+                            for name in plays
+                        ],
+                        value=play,
+                        clearable=False
+                    ),
                     dcc.RadioItems(
                         id='radio-items',
                         options=[
@@ -105,33 +108,72 @@ def init_app_layout(figure):
     ])
 
 
+def get_header(play):
+    '''
+        Gets the subtitle of the page for the given play.
+
+        Args:
+            play: The name of the displayed play.
+        Returns:
+            The subtitle of the page.
+    '''
+    return f'An analysis of Shakespeare\'s {corpus.get_play_title(play)}'
+
+
+def init_figures(data):
+    '''
+        Draws the bar chart once for each display mode, so
+        changing the mode does not redraw the figure.
+
+        Args:
+            data: The data to display.
+        Returns:
+            A dictionary mapping each mode to its figure.
+    '''
+    figures = {}
+    for mode in MODES.values():
+        figure = bar_chart.init_figure()
+        figure = bar_chart.draw(figure, data, mode)
+        figures[mode] = bar_chart.update_y_axis(figure, mode)
+    return figures
+
+
 @app.callback(
-    [Output('line-chart', 'figure'), Output('mode', 'children')],
-    [Input('radio-items', 'value')],
-    [State('line-chart', 'figure')]
+    [Output('line-chart', 'figure'), Output('mode', 'children'),
+     Output('play-title', 'children')],
+    [Input('radio-items', 'value'), Input('play-dropdown', 'value')],
+    prevent_initial_call=True
 )
-def radio_updated(mode, figure):
+def radio_updated(mode, play):
     '''
-        Updates the application after the radio input is modified.
+        Updates the application after the radio input or
+        the selected play is modified.
 
         Args:
             mode: The mode selected in the radio input.
-            figure: The figure as it is currently displayed
+            play: The play selected in the dropdown.
         Returns:
             new_fig: The figure to display after the change of radio input
             mode: The new mode
+            header: The subtitle naming the selected play
     '''
-    # TODO : Update the figure's data and y axis, as well as the informational
-    # text indicating the mode
-    new_fig = bar_chart.draw(figure, data, mode)
-    new_fig = bar_chart.update_y_axis(new_fig, mode)
-    return new_fig, mode
+    # Serve the figure drawn at startup for the selected play and mode
+    new_fig = figures[play][mode]
+
+    # A new play is drawn entirely, while a new mode only updates
+    # the values of the bars of the displayed play
+    if dash.ctx.triggered_id == 'play-dropdown':
+        return new_fig, dash.no_update, get_header(play)
+    return bar_chart.get_mode_patch(new_fig), mode, dash.no_update
 
 
 data = prep_data()
 
 create_template()
 
-fig = bar_chart.init_figure()
+figures = {play: init_figures(play_data) for play, play_data in data.items()}
+
+default_play = corpus.DEFAULT_PLAY if corpus.DEFAULT_PLAY in data else next(iter(data))
 
-app.layout = init_app_layout(fig)
+app.layout = init_app_layout(
+    figures[default_play][MODES['count']], list(data), default_play)
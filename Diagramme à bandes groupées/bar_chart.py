@@ -5,6 +5,7 @@
 
 import plotly.graph_objects as go
 import plotly.io as pio
+from dash import Patch
 
 from hover_template import get_hover_template
 from modes import MODES, MODE_TO_COLUMN
@@ -51,20 +52,22 @@ def draw(fig, data, mode):
     fig.data = []
     y_column = MODE_TO_COLUMN[mode]      #Choose which column to plot on y-axis
 
-    # Sort players alphabetically for consistent trace ordering
-    players_order = sorted(data['Player'].unique()) 
-
-    for player in players_order:
-        player_data = data[data['Player'] == player]
-
-        # Add a bar trace per player with customized hover templates
-        fig.add_trace(go.Bar(
+    # Partition the data by player in a single pass, players being sorted
+    # alphabetically for consistent trace ordering, and build a bar trace
+    # per player with its hover template
+    traces = [
+        go.Bar(
             x=player_data['Act'],
             y=player_data[y_column],
             name=player,
-            hovertemplate=[get_hover_template(player, mode)] * len(player_data),
-        ))
-    
+            hovertemplate=get_hover_template(player, mode),
+        )
+        for player, player_data in data.groupby('Player', sort=True, observed=True)
+    ]
+
+    # Add all the traces at once
+    fig.add_traces(traces)
+
     return fig
 
 
@@ -86,4 +89,25 @@ def update_y_axis(fig, mode):
     else:
         fig.update_yaxes(title_text='Lines (%)')
 
-    return fig
\ No newline at end of file
+    return fig
+
+
+def get_mode_patch(fig):
+    '''
+        Gets the partial update turning the displayed bar chart of
+        a play into the given bar chart of the same play in another
+        mode. Only the values of the bars, their hover templates and
+        the title of the y axis are sent.
+
+        Args:
+            fig: The bar chart to display
+        Returns:
+            The partial update of the displayed figure
+    '''
+    patched = Patch()
+    # The traces of both modes are drawn for the same players in the same order
+    for index, trace in enumerate(fig.data):
+        patched['data'][index]['y'] = trace.y
+        patched['data'][index]['hovertemplate'] = trace.hovertemplate
+    patched['layout']['yaxis']['title']['text'] = fig.layout.yaxis.title.text
+    return patched
@@ -0,0 +1,121 @@
+'''
+    Contains the functions to cache preprocessed data on disk.
+
+    The dataframes are stored in the Feather columnar format, so
+    they can be loaded as typed columns instead of parsing the
+    source files again at every start of the application.
+
+    Each app runs from its own directory and imports its modules
+    directly, as with 'server.py', so this module is copied in every
+    app. The copies must be kept identical.
+'''
+import glob
+import hashlib
+import os
+
+try:
+    import pyarrow
+    from pyarrow import feather
+except ImportError:
+    pyarrow = None
+
+CACHE_DIR = './cache'
+
+
+def get_file_hash(path):
+    '''
+        Computes the hash of the content of the given file.
+
+        Args:
+            path: The path to the file
+        Returns:
+            The hexadecimal SHA-1 digest of the file
+    '''
+    digest = hashlib.sha1()
+    with open(path, 'rb') as source:
+        for chunk in iter(lambda: source.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cached_frame(name, source_path, build):
+    '''
+        Gets the dataframe built from the given source file,
+        reading it from the cache if the file did not change.
+
+        The cached dataframe is named after the hash of the
+        source file, so modifying the file invalidates it.
+        Previous versions of the cached dataframe are deleted.
+
+        If pyarrow is not installed, or if the dataframe can't
+        be stored in the Feather format, it is built every time.
+
+        Args:
+            name: The name identifying the cached dataframe
+            source_path: The path to the file the dataframe is built from
+            build: A function without arguments building the dataframe
+        Returns:
+            The built or cached dataframe
+    '''
+    if pyarrow is None:
+        return build()
+
+    file_hash = get_file_hash(source_path)[:16]
+    cache_path = os.path.join(CACHE_DIR, f'{name}.{file_hash}.feather')
+
+    dataframe = read_frame(cache_path)
+    if dataframe is not None:
+        return dataframe
+
+    dataframe = build()
+
+    for stale_path in glob.glob(os.path.join(CACHE_DIR, f'{name}.*.feather')):
+        if stale_path != cache_path:
+            os.remove(stale_path)
+
+    write_frame(dataframe, cache_path)
+    return dataframe
+
+
+def read_frame(cache_path):
+    '''
+        Reads a dataframe stored in the cache.
+
+        Args:
+            cache_path: The path to the Feather file of the dataframe
+        Returns:
+            The dataframe, or None if it is not in the cache or
+            if pyarrow is not installed
+    '''
+    if pyarrow is None or not os.path.exists(cache_path):
+        return None
+    return feather.read_feather(cache_path, memory_map=True)
+
+
+def write_frame(dataframe, cache_path):
+    '''
+        Stores a dataframe in the cache, if pyarrow is installed
+        and the dataframe can be stored in the Feather format.
+
+        Args:
+            dataframe: The dataframe to store
+            cache_path: The path to the Feather file of the dataframe
+        Returns:
+            Whether the dataframe was stored
+    '''
+    if pyarrow is None:
+        return False
+
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+
+    # Write to a temporary file first, so concurrent workers never read
+    # a partially written cache
+    temp_path = f'{cache_path}.{os.getpid()}.tmp'
+    try:
+        feather.write_feather(dataframe, temp_path)
+    except pyarrow.ArrowException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return False
+    os.replace(temp_path, cache_path)
+    return True
@@ -0,0 +1,119 @@
+'''
+    Contains the functions to manage the corpus of plays
+    which can be displayed in the bar chart.
+
+    Each .csv file of the corpus directory contains the lines of
+    one play. The number and percentage of lines per player per
+    act of every play are stored in a cube cached on disk, which
+    only recomputes the plays whose file was added or modified.
+'''
+import glob
+import os
+
+import pandas as pd
+
+import cache
+import preprocess
+
+CORPUS_DIR = './assets/data'
+CUBE_PATH = os.path.join(cache.CACHE_DIR, 'line_cube.feather')
+DEFAULT_PLAY = 'romeo_and_juliet'
+# The words which are not capitalized in the titles, unless they come first
+MINOR_WORDS = ('a', 'an', 'and', 'as', 'at', 'for', 'in', 'of', 'on', 'or', 'the', 'to')
+
+
+def get_play_title(play):
+    '''
+        Gets the title to display for the given play, where each
+        word of its name is capitalized, except the minor words.
+
+        Args:
+            play: The name of the play, which is the name of its file
+        Returns:
+            The title of the play
+    '''
+    words = play.split('_')
+    return ' '.join(
+        word if index > 0 and word in MINOR_WORDS else word.capitalize()
+        for index, word in enumerate(words)
+    )
+
+
+def update_cube(corpus_dir=CORPUS_DIR, cube_path=CUBE_PATH):
+    '''
+        Updates the cube containing the lines per player per act
+        of each play in the corpus, and saves it on disk.
+
+        Only the plays whose file is new or was modified since the
+        last update are summarized with 'summarize_lines'. The plays
+        whose file was removed are removed from the cube.
+
+        The cube is stored in the cache with 'cache.write_frame'. The
+        hash of the file of each play is kept in the column 'Hash',
+        so the cube does not need another file to know which plays
+        changed. If pyarrow is not installed, every play is
+        summarized at each update. A FileNotFoundError is raised if
+        the corpus does not contain any play.
+
+        Args:
+            corpus_dir: The directory containing the .csv files of the plays
+            cube_path: The path to the file in which the cube is saved
+        Returns:
+            The cube, as a dataframe with the columns 'Play', 'Hash',
+            'Act', 'Player', 'LineCount' and 'LinePercent'
+    '''
+    sources = {
+        os.path.splitext(os.path.basename(path))[0]: path
+        for path in sorted(glob.glob(os.path.join(corpus_dir, '*.csv')))
+    }
+    if not sources:
+        raise FileNotFoundError(f'No .csv file of a play was found in {corpus_dir}')
+    hashes = {play: cache.get_file_hash(path) for play, path in sources.items()}
+
+    saved = cache.read_frame(cube_path)
+    if saved is None:
+        saved_hashes = {}
+    else:
+        saved_hashes = saved.groupby('Play', observed=True)['Hash'].first().to_dict()
+
+    if saved_hashes == hashes:
+        return saved
+
+    # Keep the plays which did not change and summarize the others
+    parts = []
+    if saved is not None:
+        unchanged = [play for play in hashes if saved_hashes.get(play) == hashes[play]]
+        parts.append(saved[saved['Play'].isin(unchanged)])
+
+    for play, path in sources.items():
+        if saved_hashes.get(play) != hashes[play]:
+            play_df = preprocess.summarize_lines(pd.read_csv(path))
+            play_df.insert(0, 'Play', play)
+            play_df.insert(1, 'Hash', hashes[play])
+            parts.append(play_df)
+
+    cube = pd.concat(parts, ignore_index=True)
+    cube['Play'] = cube['Play'].astype('category').cat.remove_unused_categories()
+
+    cache.write_frame(cube, cube_path)
+    return cube
+
+
+def split_plays(cube):
+    '''
+        Splits the cube into the data to display for each play,
+        where the players not in the top 5 of the play are grouped
+        with 'replace_others' and the names are formatted with
+        'clean_names'.
+
+        Args:
+            cube: The cube returned by 'update_cube'
+        Returns:
+            A dictionary mapping the name of each play to its data
+    '''
+    play_data = {}
+    for play, play_df in cube.groupby('Play', sort=True, observed=True):
+        play_df = play_df.drop(columns=['Play', 'Hash']).reset_index(drop=True)
+        play_df = preprocess.replace_others(play_df)
+        play_data[play] = preprocess.clean_names(play_df)
+    return play_data
@@ -23,20 +23,16 @@ def summarize_lines(my_df):
             The modified pandas dataframe containing the
             information described above.
     '''
+    # Use categories for the acts and players, so they are grouped by their codes
+    keys = my_df[['Act', 'Player']].astype('category')
+
     # Count the number of lines per player per act
-    player_lines = my_df.groupby(['Act', 'Player']).size().reset_index(name='LineCount')
-    
-    # Calculate the total number of lines per act
-    act_total_lines = player_lines.groupby('Act')['LineCount'].sum().reset_index(name='TotalLines')
-    
-    # Merge to associate each player's line count with the total lines of the act
-    player_df = pd.merge(player_lines, act_total_lines, on='Act')
+    player_df = keys.groupby(['Act', 'Player'], observed=True).size().reset_index(name='LineCount')
 
-    # Compute the percentage of lines for each player within their act
-    player_df['LinePercent'] = (player_df['LineCount'] / player_df['TotalLines']) * 100
-    
-    # Drop the total line count column, as it's no longer needed
-    player_df.drop(columns=['TotalLines'], inplace=True)
+    # Compute the percentage of lines for each player within their act,
+    # broadcasting the total number of lines of the act to each row
+    act_total_lines = player_df.groupby('Act', observed=True)['LineCount'].transform('sum')
+    player_df['LinePercent'] = (player_df['LineCount'] / act_total_lines) * 100
     
     return player_df
 
@@ -67,13 +63,15 @@ def replace_others(my_df):
     # TODO : Replace players in each act not in the top 5 by a
 
     # Sum line count and percentage for "other" players, grouped by act
-    top_players = my_df.groupby('Player')['LineCount'].sum().nlargest(5).index
+    top_players = my_df.groupby('Player', observed=True)['LineCount'].sum().nlargest(5).index
     
-    others_df = my_df[~my_df['Player'].isin(top_players)]
-    top_df = my_df[my_df['Player'].isin(top_players)]
+    # Split the players in a single scan
+    is_top = my_df['Player'].isin(top_players)
+    others_df = my_df[~is_top]
+    top_df = my_df[is_top]
     
     # Set the player name as 'OTHER' for all grouped entries
-    others_summed = others_df.groupby('Act').agg({'LineCount': 'sum', 'LinePercent': 'sum'}).reset_index()
+    others_summed = others_df.groupby('Act', observed=True).agg({'LineCount': 'sum', 'LinePercent': 'sum'}).reset_index()
     others_summed['Player'] = 'OTHER'
     
     # Combine the top players and the "OTHER" group into a single dataframe
@@ -92,9 +90,10 @@ def clean_names(my_df):
     '''
     # TODO : Clean the player names
 
-    # Capitalize the first letter of each word in the player's name
-    my_df['Player'] = my_df['Player'].apply(lambda name: name.title())
+    # Capitalize the first letter of each word in the player's name. As the
+    # names are categorical, each distinct name is only formatted once
+    my_df['Player'] = my_df['Player'].astype('category').str.title().astype('category')
 
-    # Add the prefix 'Act ' in front of each act number 
-    my_df['Act'] = my_df['Act'].apply(lambda x: f'Act {x}')
+    # Add the prefix 'Act ' in front of each act number
+    my_df['Act'] = my_df['Act'].astype('category').cat.rename_categories(lambda act: f'Act {act}')
     return my_df
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+
+'''
+    File name: app.py
+    Course: INF8808
+    Python Version: 3.8
+
+    This file is the entry point for our dash app.
+'''
+
+import hashlib
+import os
+from functools import lru_cache
+
+import dash
+import dash_html_components as html
+import dash_core_components as dcc
+import flask
+import plotly
+from plotly.io.json import to_json_plotly
+
+import cache
+import preprocess
+import bubble
+import frames
+
+
+app = dash.Dash(__name__)
+app.title = 'TP4 | INF8808'
+
+# The years of the animation, or None to animate every year of the data
+YEARS = [2000, 2015]
+# Whether the frames after the first one are loaded on demand
+STREAM_FRAMES = True
+
+
+def get_app_version():
+    '''
+        Gets the version of the app, which changes with the settings
+        of the animation and the versions of Dash and Plotly, as they
+        change the layout sent to the browser.
+
+        Returns:
+            The version of the app
+    '''
+    settings = (YEARS, STREAM_FRAMES, dash.__version__, plotly.__version__)
+    return hashlib.sha1(repr(settings).encode()).hexdigest()
+
+
+APP_VERSION = get_app_version()
+
+
+@lru_cache(maxsize=1)
+def get_file_version(path, modified, size):
+    '''
+        Gets the version of the given file, which is the hash of its
+        content. The hash is only computed again when the modification
+        time or the size of the file changes.
+
+        Args:
+            path: The path to the file
+            modified: The modification time of the file
+            size: The size of the file
+        Returns:
+            The version of the file
+    '''
+    return cache.get_file_hash(path)
+
+
+def get_data_version(path=preprocess.DATA_PATH):
+    '''
+        Gets the version of the dataset displayed by the app.
+
+        Args:
+            path: The path to the JSON file containing the data
+        Returns:
+            The version of the dataset
+    '''
+    stat = os.stat(path)
+    return get_file_version(path, stat.st_mtime_ns, stat.st_size)
+
+
+def get_figure():
+    '''
+        Generates the bubble plot from the data of the years to display.
+
+        Returns:
+            The figure to display, with all its frames
+    '''
+    my_df = preprocess.sort_dy_by_yr_continent(preprocess.get_years_df(YEARS))
+
+    gdp_range = preprocess.get_range('GDP', my_df)
+    co2_range = preprocess.get_range('CO2', my_df)
+
+    fig = bubble.get_plot(my_df, gdp_range, co2_range)
+    fig = bubble.update_animation_hover_template(fig)
+    fig = bubble.update_animation_menu(fig)
+    fig = bubble.update_axes_labels(fig)
+    fig = bubble.update_template(fig)
+    fig = bubble.update_legend(fig)
+    fig.update_layout(dragmode=False)
+    return fig
+
+
+def init_app_layout(figure):
+    '''
+        Generates the HTML layout representing the app.
+
+        Args:
+            figure: The figure to display.
+        Returns:
+            The HTML structure of the app's web page.
+    '''
+    return html.Div(className='content', children=[
+        html.Header(children=[
+            html.H1('GDP vs. CO2 emissions'),
+            html.H2('Per country, by continent')
+        ]),
+        html.Main(className='viz-container', children=[
+            dcc.Graph(
+                figure=figure,
+                config=dict(
+                    scrollZoom=False,
+                    showTips=False,
+                    showAxisDragHandles=False,
+                    doubleClick=False,
+                    displayModeBar=False
+                ),
+                className='graph',
+                id='bubble-plot'
+            )
+        ])
+    ])
+
+
+@lru_cache(maxsize=1)
+def get_page(version):
+    '''
+        Builds the page for the given version of the dataset.
+
+        The page is only built once per version, and its layout is
+        serialized once, as it is sent to the browser.
+
+        Args:
+            version: The version of the dataset, as given by 'get_data_version'
+        Returns:
+            A dictionary containing the 'layout' of the page, its
+            serialization 'layout_json', the 'frames' of the animation
+            to serve, as given by 'frames.get_frame_payloads', and
+            their ETags 'frame_etags', as given by 'frames.get_frame_etags'
+    '''
+    fig = get_figure()
+
+    if STREAM_FRAMES:
+        payloads = frames.get_frame_payloads(fig)
+        fig = frames.get_streamed_figure(
+            fig, f'{app.config.requests_pathname_prefix}{frames.FRAME_PATH}')
+    else:
+        payloads = {}
+
+    layout = init_app_layout(fig)
+    return dict(layout=layout, layout_json=to_json_plotly(layout),
+                frames=payloads, frame_etags=frames.get_frame_etags(payloads))
+
+
+def serve_layout():
+    '''
+        Gets the layout of the page for the current version of the dataset.
+
+        Returns:
+            The HTML structure of the app's web page.
+    '''
+    return get_page(get_data_version())['layout']
+
+
+@app.server.before_request
+def serve_cached_layout():
+    '''
+        Answers the requests for the layout with its cached serialization,
+        instead of letting Dash serialize it again.
+
+        The versions of the app and of the dataset are used as the ETag
+        of the layout, so the browsers which already have it receive an
+        empty response with the status 304.
+
+        Returns:
+            The response to the request for the layout, or None to let
+            the other requests be handled normally
+    '''
+    if flask.request.path != f'{app.config.routes_pathname_prefix}_dash-layout':
+        return None
+
+    version = get_data_version()
+    response = flask.Response(get_page(version)['layout_json'], mimetype='application/json')
+    response.set_etag(f'{APP_VERSION}-{version}')
+    return response.make_conditional(flask.request)
+
+
+def get_frames():
+    '''
+        Gets the frames of the animation to serve for the current
+        version of the dataset.
+
+        Returns:
+            The frames to serve and their ETags
+    '''
+    page = get_page(get_data_version())
+    return page['frames'], page['frame_etags']
+
+
+frames.register_frame_route(
+    app.server, get_frames, f'{app.config.routes_pathname_prefix}{frames.FRAME_PATH}')
+
+app.layout = serve_layout
@@ -0,0 +1,141 @@
+/*
+    Streams the frames of the animation of the bubble plot.
+
+    The figure sent with the page only contains its first frame, the
+    names of the others being in 'layout.meta.frameStream'. Its play
+    button and slider do nothing by themselves, so this script loads
+    the frames they need from the server, a few in advance, adds them
+    to the figure, animates it and moves the slider to the frame shown.
+*/
+(function () {
+    'use strict';
+
+    function getStream(gd) {
+        var meta = gd.layout && gd.layout.meta;
+        return meta && meta.frameStream;
+    }
+
+    function getState(gd, stream) {
+        // A new figure only contains its first frame again
+        if (!gd._frameStream || gd._frameStream.stream !== stream) {
+            var requests = {};
+            requests[stream.frames[0]] = Promise.resolve();
+            gd._frameStream = {
+                stream: stream,
+                requests: requests,
+                current: 0,
+                playing: false
+            };
+        }
+        return gd._frameStream;
+    }
+
+    function loadFrame(gd, state, index) {
+        var name = state.stream.frames[index];
+        if (!(name in state.requests)) {
+            state.requests[name] = fetch(state.stream.url + encodeURIComponent(name))
+                .then(function (response) {
+                    if (!response.ok) {
+                        throw new Error('Could not load the frame ' + name);
+                    }
+                    return response.json();
+                })
+                .then(function (frame) {
+                    return Plotly.addFrames(gd, [frame]);
+                })
+                .catch(function (error) {
+                    // Load the frame again the next time it is needed
+                    delete state.requests[name];
+                    throw error;
+                });
+        }
+        return state.requests[name];
+    }
+
+    function showFrame(gd, state, index, duration) {
+        // Load the next frames while this one is displayed
+        var last = Math.min(index + state.stream.prefetch, state.stream.frames.length - 1);
+        for (var next = index + 1; next <= last; next++) {
+            loadFrame(gd, state, next).catch(function () {});
+        }
+
+        return loadFrame(gd, state, index).then(function () {
+            state.current = index;
+            // The steps of the slider do nothing by themselves, so Plotly
+            // does not move it with the animation
+            return Plotly.relayout(gd, {'sliders[0].active': index});
+        }).then(function () {
+            return Plotly.animate(gd, [state.stream.frames[index]], {
+                frame: {duration: duration, redraw: false},
+                transition: {duration: duration, easing: 'linear'},
+                mode: 'immediate'
+            });
+        });
+    }
+
+    function play(gd, state) {
+        if (state.playing) {
+            return;
+        }
+        state.playing = true;
+
+        var frameCount = state.stream.frames.length;
+        var step = function (index) {
+            if (!state.playing || index >= frameCount) {
+                state.playing = false;
+                return;
+            }
+            showFrame(gd, state, index, state.stream.duration).then(function () {
+                step(index + 1);
+            }, function () {
+                state.playing = false;
+            });
+        };
+
+        // Play from the current frame, or from the start if it is the last one
+        step(state.current + 1 < frameCount ? state.current + 1 : 0);
+    }
+
+    function attach(gd) {
+        gd.on('plotly_buttonclicked', function (data) {
+            var stream = getStream(gd);
+            if (!stream) {
+                return;
+            }
+            var state = getState(gd, stream);
+            // As with Plotly's buttons, the play button animates all the
+            // frames and the stop button animates none
+            if (data.button.args[0] === null) {
+                play(gd, state);
+            } else {
+                state.playing = false;
+            }
+        });
+
+        gd.on('plotly_sliderchange', function (data) {
+            var stream = getStream(gd);
+            // The slider also changes while the animation plays
+            if (!stream || !data.interaction) {
+                return;
+            }
+            var state = getState(gd, stream);
+            state.playing = false;
+            showFrame(gd, state, stream.frames.indexOf(data.step.label), 0).catch(function () {});
+        });
+    }
+
+    function attachAll() {
+        document.querySelectorAll('.js-plotly-plot').forEach(function (gd) {
+            if (!gd._frameStreamAttached && typeof gd.on === 'function') {
+                gd._frameStreamAttached = true;
+                attach(gd);
+            }
+        });
+    }
+
+    // The graphs are rendered after the script is loaded
+    new MutationObserver(attachAll).observe(document.documentElement, {
+        childList: true,
+        subtree: true
+    });
+})();
@@ -0,0 +1,209 @@
+'''
+    Contains some benchmarks of the creation of the bubble plot.
+
+    Usage:
+        python benchmark.py hover [--repeat REPEAT]
+        python benchmark.py figure [--repeat REPEAT]
+
+    The hover benchmark measures the time taken to set the hover
+    template of animations with an increasing number of frames, and
+    the size of the serialized figures.
+
+    The figure benchmark measures the time taken to draw the bubble
+    plot with Plotly Express and with the current 'get_plot', for
+    an increasing number of frames.
+'''
+import argparse
+import copy
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+import bubble
+import hover_template
+
+# The number of frames of the benchmarked animations
+FRAME_COUNTS = [2, 20, 200]
+COUNTRY_COUNT = 200
+CONTINENTS = ['Africa', 'Asia', 'Europe', 'North America', 'Oceania', 'South America']
+
+
+def get_countries_df(years, countries=COUNTRY_COUNT, seed=0):
+    '''
+        Generates random data for the given number of years,
+        with the columns of the real data.
+
+        Args:
+            years: The number of years, one frame being displayed per year
+            countries: The number of countries
+            seed: The seed of the random generator
+        Returns:
+            The dataframe, sorted by year and continent
+    '''
+    rng = np.random.default_rng(seed)
+    rows = years * countries
+    return pd.DataFrame({
+        'Country Name': np.tile([f'Country {i}' for i in range(countries)], years),
+        'Continent': np.tile(rng.choice(CONTINENTS, countries), years),
+        'GDP': rng.uniform(100, 100000, rows).round(2),
+        'CO2': rng.uniform(0.01, 50, rows).round(2),
+        'Population': rng.integers(100000, 1000000000, rows),
+        'Year': np.repeat(np.arange(2000, 2000 + years), countries)
+    }).sort_values(['Year', 'Continent'])
+
+
+def update_legacy_hover_template(fig):
+    '''
+        Sets the hover template as it was before it was only set on
+        the traces of the figure, setting it on each trace of each frame.
+
+        Args:
+            fig: The figure to update
+        Returns:
+            The updated figure
+    '''
+    fig.update_traces(hovertemplate=hover_template.get_bubble_hover_template())
+    for frame in fig.frames:
+        for data in frame.data:
+            data.update(hovertemplate=hover_template.get_bubble_hover_template())
+    return fig
+
+
+def get_legacy_plot(my_df, gdp_range, co2_range):
+    '''
+        Generates the bubble plot as it was before it was drawn
+        without Plotly Express.
+
+        Args:
+            my_df: The dataframe to display
+            gdp_range: The range for the x axis
+            co2_range: The range for the y axis
+        Returns:
+            The generated figure
+    '''
+    fig = px.scatter(my_df,
+                     x='GDP',
+                     y='CO2',
+                     animation_frame='Year',
+                     animation_group='Country Name',
+                     range_x=gdp_range,
+                     range_y=co2_range,
+                     log_x=True,
+                     log_y=True,
+                     size='Population',
+                     size_max=30,
+                     color='Continent',
+                     custom_data=['Country Name', 'Population'],
+                     )
+    fig.update_traces(marker=dict(sizemin=5))
+    return fig
+
+
+def time_call(function, repeat):
+    '''
+        Measures the best time taken by a call to the given function.
+
+        Args:
+            function: A function without arguments
+            repeat: The number of times to call the function
+        Returns:
+            The best time taken by a call, in milliseconds
+    '''
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def time_update(update, fig, repeat):
+    '''
+        Measures the best time taken to update copies of the figure.
+
+        Args:
+            update: The function updating the figure
+            fig: The figure to update
+            repeat: The number of times to update the figure
+        Returns:
+            The best time taken by an update, in milliseconds,
+            and the last updated figure
+    '''
+    times = []
+    for _ in range(repeat):
+        updated = copy.deepcopy(fig)
+        start = time.perf_counter()
+        update(updated)
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000, updated
+
+
+def benchmark_hover(repeat):
+    '''
+        Prints the time taken to set the hover template of the
+        animation and the size of the resulting figure, for each
+        way of setting it.
+
+        Args:
+            repeat: The number of times each measure is repeated
+    '''
+    updates = {
+        'Every frame': update_legacy_hover_template,
+        'Traces only': bubble.update_animation_hover_template
+    }
+
+    print(f'{"Frames":<8}{"Template":<14}{"Update (ms)":>14}{"JSON (kB)":>12}')
+    for frame_count in FRAME_COUNTS:
+        my_df = get_countries_df(frame_count)
+        fig = bubble.get_plot(my_df, [100, 100000], [0.01, 50])
+        for label, update in updates.items():
+            update_time, updated = time_update(update, fig, repeat)
+            size = len(updated.to_json()) / 1000
+            print(f'{frame_count:<8}{label:<14}{update_time:>14.2f}{size:>12.1f}')
+
+
+def benchmark_figure(repeat):
+    '''
+        Prints the time taken to draw the bubble plot with
+        Plotly Express and with the current 'get_plot'.
+
+        Args:
+            repeat: The number of times each measure is repeated
+    '''
+    builders = {'px.scatter': get_legacy_plot, 'go.Frame': bubble.get_plot}
+
+    print(f'{"Frames":<8}{"Builder":<14}{"Build (ms)":>14}')
+    for frame_count in FRAME_COUNTS:
+        my_df = get_countries_df(frame_count)
+        for label, builder in builders.items():
+            build_time = time_call(
+                lambda builder=builder, my_df=my_df: builder(my_df, [100, 100000], [0.01, 50]),
+                repeat)
+            print(f'{frame_count:<8}{label:<14}{build_time:>14.2f}')
+
+
+def main():
+    '''
+        Runs the benchmark given on the command line.
+    '''
+    parser = argparse.ArgumentParser(description='Benchmarks the bubble plot.')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    hover_parser = subparsers.add_parser('hover', help='time to set the hover template')
+    hover_parser.add_argument('--repeat', type=int, default=5)
+
+    figure_parser = subparsers.add_parser('figure', help='time to draw the bubble plot')
+    figure_parser.add_argument('--repeat', type=int, default=5)
+
+    args = parser.parse_args()
+
+    if args.benchmark == 'hover':
+        benchmark_hover(args.repeat)
+    elif args.benchmark == 'figure':
+        benchmark_figure(args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,10 +2,37 @@
     This file contains the code for the bubble plot.
 '''
 
+import numpy as np
+import pandas as pd
 import plotly.express as px
+import plotly.graph_objects as go
 
 import hover_template
 
+SIZE_MAX = 30
+SIZE_MIN = 5
+# The duration of the transition between two frames, in milliseconds
+FRAME_DURATION = 500
+
+
+def get_animation_args(frames, duration):
+    '''
+        Gets the arguments of the 'animate' method to play the given
+        frames, with the options used by Plotly Express.
+
+        Args:
+            frames: The frames to play, as accepted by Plotly.animate
+            duration: The duration of each frame, in milliseconds
+        Returns:
+            The arguments of the 'animate' method
+    '''
+    return [frames, dict(
+        frame=dict(duration=duration, redraw=False),
+        mode='immediate',
+        fromcurrent=True,
+        transition=dict(duration=duration, easing='linear')
+    )]
+
 
 def get_plot(my_df, gdp_range, co2_range):
     '''
@@ -19,6 +46,12 @@ def get_plot(my_df, gdp_range, co2_range):
         The markers' maximum size is 30 and their minimum
         size is 6.
 
+        The figure has the structure of the one Plotly Express draws,
+        with a frame per year and a trace per continent, but its
+        arrays are split in a single pass. Every frame contains a
+        trace for every continent, which may be empty, so the traces
+        always match the continents of the legend.
+
         Args:
             my_df: The dataframe to display
             gdp_range: The range for the x axis
@@ -27,21 +60,84 @@ def get_plot(my_df, gdp_range, co2_range):
             The generated figure
     '''
     # TODO : Define figure with animation
-    fig = px.scatter(my_df,
-                     x='GDP',
-                     y='CO2',
-                     animation_frame='Year',
-                     animation_group='Country Name',
-                     range_x=gdp_range,
-                     range_y=co2_range,
-                     log_x=True,
-                     log_y=True,
-                     size='Population',
-                     size_max=30,
-                     color='Continent',
-                     custom_data=['Country Name', 'Population'],
-                     )
-    fig.update_traces(marker=dict(sizemin=5))
+    # The years and continents are in their order of appearance
+    year_codes, years = pd.factorize(my_df['Year'])
+    continent_codes, continents = pd.factorize(my_df['Continent'])
+    colors = px.colors.qualitative.Plotly
+
+    # Sort the rows by year, then by continent, keeping their order within
+    # each group, and find where each year and continent starts
+    order = np.lexsort((continent_codes, year_codes))
+    group_codes = (year_codes * len(continents) + continent_codes)[order]
+    bounds = np.searchsorted(group_codes, np.arange(len(years) * len(continents) + 1))
+
+    countries = my_df['Country Name'].to_numpy(dtype=object)[order]
+    gdp = my_df['GDP'].to_numpy()[order]
+    co2 = my_df['CO2'].to_numpy()[order]
+    population = my_df['Population'].to_numpy()[order]
+    # The custom data is in the order used by the hover template
+    customdata = np.column_stack((countries, gdp, co2, population))
+
+    # The area of the markers is proportional to the population
+    sizeref = population.max() / SIZE_MAX ** 2
+
+    frames = []
+    for year_index, year in enumerate(years):
+        traces = []
+        for continent_index, continent in enumerate(continents):
+            group = year_index * len(continents) + continent_index
+            rows = slice(bounds[group], bounds[group + 1])
+            traces.append(go.Scatter(
+                x=gdp[rows],
+                y=co2[rows],
+                ids=countries[rows],
+                customdata=customdata[rows],
+                name=continent,
+                legendgroup=continent,
+                mode='markers',
+                marker=dict(
+                    color=colors[continent_index % len(colors)],
+                    size=population[rows],
+                    sizemode='area',
+                    sizeref=sizeref
+                )
+            ))
+        frames.append(go.Frame(data=traces, name=str(year)))
+
+    fig = go.Figure(data=frames[0].data, frames=frames)
+    fig.update_traces(marker_sizemin=SIZE_MIN)
+
+    fig.update_layout(
+        xaxis=dict(title_text='GDP', type='log', range=np.log10(gdp_range)),
+        yaxis=dict(title_text='CO2', type='log', range=np.log10(co2_range)),
+        legend=dict(title_text='Continent', tracegroupgap=0, itemsizing='constant'),
+        margin_t=60,
+        updatemenus=[dict(
+            type='buttons',
+            direction='left',
+            showactive=False,
+            buttons=[
+                dict(label='&#9654;', method='animate',
+                     args=get_animation_args(None, FRAME_DURATION)),
+                dict(label='&#9724;', method='animate',
+                     args=get_animation_args([None], 0))
+            ],
+            pad=dict(r=10, t=70),
+            x=0.1, xanchor='right', y=0, yanchor='top'
+        )],
+        sliders=[dict(
+            active=0,
+            currentvalue=dict(prefix='Year='),
+            len=0.9,
+            pad=dict(b=10, t=60),
+            steps=[
+                dict(label=frame.name, method='animate',
+                     args=get_animation_args([frame.name], 0))
+                for frame in frames
+            ],
+            x=0.1, xanchor='left', y=0, yanchor='top'
+        )]
+    )
     return fig
 
 
@@ -51,6 +147,11 @@ def update_animation_hover_template(fig):
         as well as the hover template of each
         trace of each animation frame of the figure
 
+        The template is only set on the traces of the figure. When
+        a frame is displayed, its traces are merged into the traces
+        of the figure, and the frames drawn by 'get_plot' have no
+        hover template of their own, so the frames are not visited.
+
         Args:
             fig: The figure to update
         Returns:
@@ -61,11 +162,6 @@ def update_animation_hover_template(fig):
     fig.update_traces(
         hovertemplate=hover_template.get_bubble_hover_template()
     )
-    for frame in fig.frames:
-        for data in frame.data:
-            data.update(
-                hovertemplate=hover_template.get_bubble_hover_template()
-            )
     return fig
 
 
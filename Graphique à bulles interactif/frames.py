@@ -0,0 +1,126 @@
+'''
+    Contains the functions to stream the frames of the animation
+    of the bubble plot from the server.
+
+    In streaming mode, the figure sent with the page only contains
+    its first frame. The other frames are serialized and compressed
+    once, then served by a route of the server, from which the
+    script 'assets/frame_stream.js' loads them when they are needed.
+'''
+import gzip
+import hashlib
+
+import flask
+import plotly.graph_objects as go
+from plotly.io.json import to_json_plotly
+
+import bubble
+
+# The path of the route of the frames, relative to the prefix of the app
+FRAME_PATH = 'bubble/frames/'
+# The number of frames loaded in advance while the animation plays
+PREFETCH = 3
+
+
+def get_frame_payloads(fig):
+    '''
+        Serializes and compresses each frame of the figure, as
+        it will be sent by the route of the frames.
+
+        Args:
+            fig: The figure containing the frames
+        Returns:
+            A dictionary mapping the name of each frame to
+            its JSON representation, compressed with gzip
+    '''
+    return {
+        frame.name: gzip.compress(to_json_plotly(frame.to_plotly_json()).encode())
+        for frame in fig.frames
+    }
+
+
+def get_frame_etags(payloads):
+    '''
+        Computes the ETag of each frame from its compressed content.
+
+        Args:
+            payloads: The frames to serve, as given by 'get_frame_payloads'
+        Returns:
+            A dictionary mapping the name of each frame to its ETag
+    '''
+    return {name: hashlib.sha1(payload).hexdigest() for name, payload in payloads.items()}
+
+
+def get_streamed_figure(fig, url, prefetch=PREFETCH, duration=bubble.FRAME_DURATION):
+    '''
+        Gets a copy of the figure containing only its first frame.
+
+        The buttons and the slider of the animation are set to do
+        nothing by themselves, as the frames are loaded and played
+        by 'assets/frame_stream.js'. The information needed by the
+        script is set in the 'meta' of the layout.
+
+        Args:
+            fig: The figure to stream, with its animation menu
+            url: The URL of the route of the frames, as requested
+                by the browser
+            prefetch: The number of frames to load in advance
+            duration: The duration of each frame, in milliseconds
+        Returns:
+            The figure to send with the page
+    '''
+    streamed = go.Figure(fig)
+    names = [frame.name for frame in streamed.frames]
+    streamed.frames = streamed.frames[:1]
+
+    for menu in streamed.layout.updatemenus:
+        for button in menu.buttons:
+            button.method = 'skip'
+    for slider in streamed.layout.sliders:
+        for step in slider.steps:
+            step.method = 'skip'
+
+    streamed.update_layout(meta=dict(frameStream=dict(
+        url=url,
+        frames=names,
+        prefetch=prefetch,
+        duration=duration
+    )))
+    return streamed
+
+
+def register_frame_route(server, get_frames, url):
+    '''
+        Adds the route serving the frames to the Flask server.
+
+        The compressed frames are sent as they are to the clients
+        accepting gzip, and decompressed for the others. Each frame
+        has an ETag, computed once with its payload, so the clients
+        which already have it receive an empty response with the
+        status 304. As the two encodings of a frame have different
+        bodies, the ETag of the decompressed frame has a suffix.
+
+        Args:
+            server: The Flask server of the app
+            get_frames: A function without arguments returning the
+                frames to serve, as given by 'get_frame_payloads',
+                and their ETags, as given by 'get_frame_etags'
+            url: The URL of the route of the frames, as seen by the server
+    '''
+    def serve_frame(name):
+        payloads, etags = get_frames()
+        if name not in payloads:
+            flask.abort(404)
+
+        if 'gzip' in flask.request.accept_encodings:
+            response = flask.Response(payloads[name], mimetype='application/json')
+            response.headers['Content-Encoding'] = 'gzip'
+            response.set_etag(etags[name])
+        else:
+            response = flask.Response(gzip.decompress(payloads[name]), mimetype='application/json')
+            response.set_etag(f'{etags[name]}-identity')
+
+        response.headers['Vary'] = 'Accept-Encoding'
+        return response.make_conditional(flask.request)
+
+    server.add_url_rule(f'{url}<name>', 'bubble_frame', serve_frame)
@@ -1,6 +1,14 @@
 '''
     Contains some functions to preprocess the data used in the visualisation.
 '''
+import hashlib
+import json
+
+import pandas as pd
+
+import cache
+
+DATA_PATH = './assets/data/countriesData.json'
 
 
 def round_decimals(my_df):
@@ -16,42 +24,37 @@ def round_decimals(my_df):
     return my_df.round(2)
 
 
-def get_range(col, df1, df2):
+def get_range(col, my_df):
     '''
         An array containing the minimum and maximum values for the given
-        column in the two dataframes.
+        column in the dataframe.
 
         args:
             col: The name of the column for which we want the range
-            df1: The first dataframe containing a column with the given name
-            df2: The first dataframe containing a column with the given name
+            my_df: The dataframe containing a column with the given name,
+                such as the one combining every year given by 'combine_dfs'
         returns:
-            The minimum and maximum values across the two dataframes
+            The minimum and maximum values of the column
     '''
-      
-    min_val = min([min(df1[col]), min(df2[col])])
-    max_val = max([max(df1[col]), max(df2[col])])
-    return [min_val, max_val]
+    return [my_df[col].min(), my_df[col].max()]
 
 
-def combine_dfs(df1, df2):
+def combine_dfs(year_dfs):
     '''
-        Combines the two dataframes, adding a column 'Year' with the
-        value 2000 for the rows from the first dataframe and the value
-        2015 for the rows from the second dataframe
+        Combines the dataframes of each year, adding a column 'Year'
+        with the year of each row. The given dataframes are not modified.
 
         args:
-            df1: The first dataframe to combine
-            df2: The second dataframe, to be appended to the first
+            year_dfs: A dictionary mapping each year to its dataframe
         returns:
-            The dataframe containing both dataframes provided as arg.
+            The dataframe containing all the dataframes provided as arg.
             Each row of the resulting dataframe has a column 'Year'
-            containing the value 2000 or 2015, depending on its
-            original dataframe.
+            containing the year of its original dataframe.
     '''
-    df1['Year'] = 2000
-    df2['Year'] = 2015
-    return df1.append(df2)
+    # The years become a level of the index in a single concatenation,
+    # which is then moved to a column
+    combined = pd.concat(year_dfs, names=['Year', None])
+    return combined.reset_index(level='Year').reset_index(drop=True)
 
 
 
@@ -67,3 +70,37 @@ def sort_dy_by_yr_continent(my_df):
       # Sort the dataframe
     sorted_df = my_df.sort_values(['Year', 'Continent'])
     return sorted_df
+
+
+def get_years_df(years=None, path=DATA_PATH):
+    '''
+        Loads the data of the given years, rounds its numbers with
+        'round_decimals' and combines the years with 'combine_dfs'.
+        The file is parsed once for all the years, and the result
+        is cached on disk until the source file changes.
+
+        args:
+            years: The years of the data to load, or None to
+                load every year in the file
+            path: The path to the JSON file containing the data
+        returns:
+            The dataframe containing the data for the given years
+    '''
+    if years is None:
+        name = 'countries-all'
+    else:
+        years = sorted(int(year) for year in years)
+        years_hash = hashlib.sha1(repr(years).encode()).hexdigest()[:8]
+        name = f'countries-years-{years_hash}'
+
+    def build():
+        with open(path, encoding='utf-8') as data_file:
+            data = json.load(data_file)
+
+        loaded_years = sorted(int(year) for year in data) if years is None else years
+        return combine_dfs({
+            year: round_decimals(pd.json_normalize(data, str(year)))
+            for year in loaded_years
+        })
+
+    return cache.cached_frame(name, path, build)
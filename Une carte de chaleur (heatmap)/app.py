@@ -10,10 +10,13 @@
     This file is the entry point for our dash app.
 '''
 
+import threading
+from functools import lru_cache
+
 import dash
 import dash_html_components as html
 import dash_core_components as dcc
-from dash.dependencies import Input, Output
+from dash.dependencies import Input, Output, State
 
 import pandas as pd
 
@@ -22,30 +25,60 @@ import heatmap
 import line_chart
 import template
 
+from levels import LEVELS, LEVEL_TO_FREQ, HEATMAP_LEVELS, LINE_CHART_LEVELS
+
 
 app = dash.Dash(__name__)
 app.title = 'TP3 | INF8808'
 
-dataframe = pd.read_csv('./assets/data/arbres.csv')
+LINE_CHART_CACHE_SIZE = 1024
+WARM_CELL_COUNT = 50
 
-dataframe = preprocess.convert_dates(dataframe)
-dataframe = preprocess.filter_years(dataframe, 2010, 2020)
-yearly_df = preprocess.summarize_yearly_counts(dataframe)
-data = preprocess.restructure_df(yearly_df)
+dataframe = preprocess.load_dataset()
+pyramid = preprocess.get_count_pyramid(dataframe)
 
 template.create_custom_theme()
 template.set_default_theme()
 
+# Draw the heatmap once for each granularity it can display
+heatmap_data = {
+    level: preprocess.restructure_df(
+        preprocess.get_level_counts(pyramid, level), columns=level)
+    for level in HEATMAP_LEVELS
+}
+heatmap_figures = {
+    level: heatmap.get_figure(data, level)
+    for level, data in heatmap_data.items()
+}
+
 app.layout = html.Div(className='content', children=[
     html.Header(children=[
         html.H1('Trees planted in Montreal neighborhoods'),
         html.H2('From 2010 to 2020')
     ]),
+    html.Div(className='controls', children=[
+        html.Div(children=[
+            html.Span('Heatmap granularity : '),
+            dcc.RadioItems(
+                id='heatmap-level',
+                options=[dict(label=level, value=level) for level in HEATMAP_LEVELS],
+                value=LEVELS['year']
+            )
+        ]),
+        html.Div(children=[
+            html.Span('Line chart granularity : '),
+            dcc.RadioItems(
+                id='line-chart-level',
+                options=[dict(label=level, value=level) for level in LINE_CHART_LEVELS],
+                value=LEVELS['day']
+            )
+        ])
+    ]),
     html.Main(className='viz-container', children=[
         dcc.Graph(
             id='heatmap',
             className='graph',
-            figure=heatmap.get_figure(data),
+            figure=heatmap_figures[LEVELS['year']],
             config=dict(
                 scrollZoom=False,
                 showTips=False,
@@ -70,37 +103,97 @@ app.layout = html.Div(className='content', children=[
 ])
 
 
+@app.callback(
+    [Output('heatmap', 'figure'), Output('heatmap', 'clickData')],
+    [Input('heatmap-level', 'value')],
+    prevent_initial_call=True
+)
+def heatmap_level_changed(level):
+    '''
+        When the granularity of the heatmap is changed,
+        displays the heatmap drawn at startup for it.
+
+        The clicked cell is cleared, as its period is
+        not one of the new heatmap.
+
+        Args:
+            level: The selected granularity
+        Returns:
+            The heatmap to display and the clicked cell
+    '''
+    return heatmap_figures[level], None
+
+
 @app.callback(
     Output('line-chart', 'figure'),
-    [Input('heatmap', 'clickData')]
+    [Input('heatmap', 'clickData'), Input('line-chart-level', 'value')],
+    [State('heatmap-level', 'value')]
 )
-def heatmap_clicked(click_data):
+def heatmap_clicked(click_data, level, heatmap_level):
     '''
         When a cell in the heatmap is clicked, updates the
         line chart to show the data for the corresponding
-        neighborhood and year. If there is no data to show,
-        displays a message.
+        neighborhood and period, at the selected granularity.
+        If there is no data to show, displays a message.
 
         Args:
             The necessary inputs and states to update the
             line chart.
         Returns:
             The necessary output values to update the line
-            chart.
+            chart, as a partial update of the displayed figure.
     '''
     if click_data is None or click_data['points'][0]['z'] == 0:
-        fig = line_chart.get_empty_figure()
-        line_chart.add_rectangle_shape(fig)
-        return fig
+        return line_chart.get_patch(line_chart.get_empty_figure())
 
     arrond = click_data['points'][0]['y']
-    year = click_data['points'][0]['x']
+    period = click_data['points'][0]['x']
 
-    line_data = preprocess.get_daily_info(
-        dataframe,
+    return line_chart.get_patch(get_line_chart(arrond, period, heatmap_level, level))
+
+
+@lru_cache(maxsize=LINE_CHART_CACHE_SIZE)
+def get_line_chart(arrond, period, heatmap_level, level):
+    '''
+        Draws the line chart for the given heatmap cell at the
+        given granularity, serialized as it is sent to the browser.
+
+        The most recently used line charts are cached, so repeated
+        clicks on a cell don't draw the line chart again.
+
+        Args:
+            arrond: The neighborhood of the cell
+            period: The label of the period of the cell
+            heatmap_level: The granularity of the heatmap, which
+                is the one of the period of the cell
+            level: The granularity of the line chart
+        Returns:
+            The serialized line chart
+    '''
+    # The frequency of the clicked period is the one of the heatmap
+    line_data = preprocess.get_period_info(
+        pyramid,
+        level,
         arrond,
-        year)
+        pd.Period(period, freq=LEVEL_TO_FREQ[heatmap_level]))
+
+    line_fig = line_chart.get_figure(line_data, arrond, period, level)
+
+    return line_fig.to_plotly_json()
+
+
+def warm_line_chart_cache(cell_count=WARM_CELL_COUNT):
+    '''
+        Draws in advance the line charts, at every granularity, of
+        the cells of the yearly heatmap where the most trees were planted.
+
+        Args:
+            cell_count: The number of cells to draw the line charts of
+    '''
+    counts = heatmap_data[LEVELS['year']].stack()
+    for arrond, year in counts.nlargest(cell_count).index:
+        for level in LINE_CHART_LEVELS:
+            get_line_chart(arrond, int(year), LEVELS['year'], level)
 
-    line_fig = line_chart.get_figure(line_data, arrond, year)
 
-    return line_fig
+threading.Thread(target=warm_line_chart_cache, daemon=True).start()
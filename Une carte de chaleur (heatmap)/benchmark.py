@@ -0,0 +1,374 @@
+'''
+    Contains some benchmarks of the data processing used in the visualisation.
+
+    Usage:
+        python benchmark.py memory [--rows ROWS]
+        python benchmark.py figure [--repeat REPEAT]
+
+    The memory benchmark writes a synthetic tree inventory to a
+    temporary .csv file, then measures the peak resident memory of
+    a fresh process running each version of the preprocessing, and
+    the peak memory allocated by its steps once the inventory is
+    read, which the copies of the dataframes add to. Every
+    version does the same steps: it converts the dates, filters the
+    years, counts the trees per neighborhood per year, restructures
+    the counts for the heatmap and drills down into the daily counts
+    of one neighborhood during one year. The time taken to build the
+    count pyramid of the app is measured separately.
+
+    The figure benchmark measures the time taken to build and
+    serialize the heatmap for matrices of increasing size.
+'''
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+import heatmap
+import hover_template
+import preprocess
+from levels import LEVELS, LEVEL_TO_FREQ
+
+NEIGHBORHOODS = [
+    'Ahuntsic - Cartierville', 'Anjou', 'Côte-des-Neiges - Notre-Dame-de-Grâce',
+    'Lachine', 'LaSalle', 'Le Plateau-Mont-Royal', 'Le Sud-Ouest',
+    'Mercier - Hochelaga-Maisonneuve', 'Montréal-Nord', 'Outremont',
+    'Rivière-des-Prairies - Pointe-aux-Trembles', 'Rosemont - La Petite-Patrie',
+    'Saint-Laurent', 'Saint-Léonard', 'Verdun', 'Ville-Marie',
+    'Villeray - Saint-Michel - Parc-Extension'
+]
+SPECIES = ['Érable argenté', 'Frêne de Pennsylvanie', 'Tilleul à petites feuilles',
+           'Micocoulier occidental', 'Févier inerme']
+
+VARIANTS = {
+    'legacy': 'Full read, copying pipeline',
+    'copy-free': 'Full read, copy-free pipeline',
+    'streaming': 'Chunked read, copy-free pipeline'
+}
+
+# The number of neighborhoods and years of the benchmarked matrices
+FIGURE_SHAPES = [(17, 11), (100, 20), (1000, 50)]
+
+
+def write_inventory(path, rows, seed=0):
+    '''
+        Writes a synthetic tree inventory with the
+        columns of the real one to a .csv file.
+
+        Args:
+            path: The path of the .csv file to write
+            rows: The number of trees in the inventory
+            seed: The seed of the random generator
+    '''
+    rng = np.random.default_rng(seed)
+    days = rng.integers(0, 35 * 365, rows).astype('timedelta64[D]')
+    dates = np.datetime_as_string(np.datetime64('1990-01-01') + days, unit='D')
+
+    pd.DataFrame({
+        'INV_TYPE': 'H',
+        'EMP_NO': np.arange(rows),
+        'ARROND': rng.integers(1, len(NEIGHBORHOODS) + 1, rows),
+        'Arrond_Nom': rng.choice(NEIGHBORHOODS, rows),
+        'Essence_fr': rng.choice(SPECIES, rows),
+        'DHP': rng.integers(1, 120, rows),
+        'Date_Plantation': dates,
+        'Longitude': rng.uniform(-73.95, -73.47, rows),
+        'Latitude': rng.uniform(45.41, 45.70, rows)
+    }).to_csv(path, index=False)
+
+
+def get_legacy_daily_info(dataframe, arrond, year):
+    '''
+        Gets the daily amount of planted trees in the given
+        neighborhood and year as it was done before the daily
+        counts were computed, from the rows of the inventory.
+
+        Args:
+            dataframe: The filtered inventory
+            arrond: The desired neighborhood
+            year: The desired year
+        Returns:
+            The daily tree count data for that
+            neighborhood and year.
+    '''
+    dataframe = dataframe.copy()
+    dataframe['Year'] = dataframe['Date_Plantation'].dt.year
+    filtered_df = dataframe[(dataframe['Arrond_Nom'] == arrond) & (dataframe['Year'] == year)]
+
+    full_df = pd.DataFrame({'Date_Plantation': pd.date_range(
+        start=filtered_df['Date_Plantation'].min(), end=filtered_df['Date_Plantation'].max())})
+    daily_counts = filtered_df.groupby('Date_Plantation').size().reset_index(name='Counts')
+
+    merged_df = pd.merge(full_df, daily_counts, on='Date_Plantation', how='left')
+    merged_df['Counts'] = merged_df['Counts'].fillna(0).astype(int)
+    return merged_df
+
+
+def get_daily_info(daily_df, arrond, year):
+    '''
+        Gets the daily amount of planted trees in the given
+        neighborhood and year from the daily counts.
+
+        Args:
+            daily_df: The daily counts, as returned by 'read_daily_counts'
+            arrond: The desired neighborhood
+            year: The desired year
+        Returns:
+            The daily tree count data for that
+            neighborhood and year.
+    '''
+    selected = daily_df[(daily_df['Arrond_Nom'] == arrond) & (daily_df['Year'] == year)]
+    counts = selected.set_index('Date_Plantation')['Counts'].sort_index()
+    return counts.asfreq(LEVEL_TO_FREQ[LEVELS['day']], fill_value=0).reset_index()
+
+
+def run_legacy(dataframe, start, end):
+    '''
+        Runs the preprocessing as it was before it stopped
+        copying the dataframes, each step copying its input.
+
+        Args:
+            dataframe: The inventory, as read from its .csv file
+            start: The starting year (inclusive)
+            end: The ending year (inclusive)
+    '''
+    dataframe = dataframe.copy()
+    dataframe['Date_Plantation'] = pd.to_datetime(dataframe['Date_Plantation'], errors='coerce')
+
+    dataframe = dataframe.copy()
+    dataframe['Year'] = dataframe['Date_Plantation'].dt.year
+    dataframe = dataframe[(dataframe['Year'] >= start) & (dataframe['Year'] <= end)]
+
+    yearly_df = dataframe.copy()
+    yearly_df['Year'] = yearly_df['Date_Plantation'].dt.year
+    yearly_df = yearly_df.groupby(['Arrond_Nom', 'Year']).size().reset_index(name='Counts')
+    preprocess.restructure_df(yearly_df)
+
+    get_legacy_daily_info(dataframe, NEIGHBORHOODS[0], end)
+
+
+def run_copy_free(dataframe, start, end):
+    '''
+        Runs the current preprocessing on the fully loaded inventory.
+
+        Args:
+            dataframe: The inventory, as read from its .csv file
+            start: The starting year (inclusive)
+            end: The ending year (inclusive)
+    '''
+    dataframe = preprocess.convert_dates(dataframe)
+    dataframe = preprocess.filter_years(dataframe, start, end)
+
+    daily_df = preprocess.summarize_daily_counts(dataframe)
+    preprocess.restructure_df(preprocess.summarize_yearly_counts(daily_df))
+    get_daily_info(daily_df, NEIGHBORHOODS[0], end)
+
+
+def run_streaming(daily_df, start, end):
+    '''
+        Runs the current preprocessing on the daily counts
+        folded from the inventory streamed by chunks.
+
+        Args:
+            daily_df: The daily counts, as returned by 'read_daily_counts'
+            start: The starting year (inclusive)
+            end: The ending year (inclusive)
+    '''
+    preprocess.restructure_df(preprocess.summarize_yearly_counts(daily_df))
+    get_daily_info(daily_df, NEIGHBORHOODS[0], end)
+
+
+def get_legacy_figure(data):
+    '''
+        Generates the heatmap as it was before it was built
+        without Plotly Express.
+
+        Args:
+            data: The data to display
+        Returns:
+            The figure to be displayed.
+    '''
+    fig = px.imshow(
+        data,
+        labels=dict(x='Year', y='Neighborhood', color='Trees'),
+        color_continuous_scale='Bluyl',
+        aspect='auto'
+    )
+    fig.update_layout(dragmode=False, xaxis_title='Year', yaxis_title='Neighborhood')
+    fig.update_traces(hovertemplate=hover_template.get_heatmap_hover_template())
+    return fig
+
+
+def get_matrix(neighborhoods, years, seed=0):
+    '''
+        Generates a random matrix of the number of trees
+        planted per neighborhood per year.
+
+        Args:
+            neighborhoods: The number of rows of the matrix
+            years: The number of columns of the matrix
+            seed: The seed of the random generator
+        Returns:
+            The matrix, as a dataframe in the format of 'restructure_df'
+    '''
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        rng.integers(0, 5000, (neighborhoods, years)),
+        index=pd.Index([f'Neighborhood {i}' for i in range(neighborhoods)], name='Arrond_Nom'),
+        columns=pd.Index(range(2020 - years + 1, 2021), name='Year'))
+
+
+def time_call(function, repeat):
+    '''
+        Measures the best time taken by a call to the given function.
+
+        Args:
+            function: A function without arguments
+            repeat: The number of times to call the function
+        Returns:
+            The best time taken by a call, in milliseconds
+    '''
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def benchmark_figure(repeat):
+    '''
+        Prints the time taken to build and to serialize the heatmap
+        with Plotly Express and with the current 'get_figure'.
+
+        Args:
+            repeat: The number of times each measure is repeated
+    '''
+    builders = {'px.imshow': get_legacy_figure, 'go.Heatmap': heatmap.get_figure}
+
+    print(f'{"Matrix":<12}{"Builder":<14}{"Build (ms)":>14}{"to_json (ms)":>16}')
+    for neighborhoods, years in FIGURE_SHAPES:
+        data = get_matrix(neighborhoods, years)
+        for label, builder in builders.items():
+            fig = builder(data)
+            build_time = time_call(lambda builder=builder, data=data: builder(data), repeat)
+            json_time = time_call(fig.to_json, repeat)
+            shape = f'{neighborhoods}x{years}'
+            print(f'{shape:<12}{label:<14}{build_time:>14.2f}{json_time:>16.2f}')
+
+
+def measure_run(variant, path, start, end):
+    '''
+        Reads the inventory as the given version of the preprocessing
+        does, then runs its steps.
+
+        Args:
+            variant: The version of the preprocessing, a key of VARIANTS
+            path: The path to the .csv file of the inventory
+            start: The starting year (inclusive)
+            end: The ending year (inclusive)
+        Returns:
+            The peak memory allocated by the steps run once
+            the inventory is read, in megabytes
+    '''
+    runners = {
+        'legacy': run_legacy,
+        'copy-free': run_copy_free,
+        'streaming': run_streaming
+    }
+    if variant == 'streaming':
+        data = preprocess.read_daily_counts(path, start, end)
+    else:
+        data = pd.read_csv(path)
+
+    tracemalloc.start()
+    runners[variant](data, start, end)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024 ** 2
+
+
+def get_peak_rss():
+    '''
+        Gets the peak resident memory of the current process.
+
+        Returns:
+            The peak resident memory, in megabytes
+    '''
+    # The peak is given in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 ** 2 if sys.platform == 'darwin' else 1024)
+
+
+def benchmark_memory(rows):
+    '''
+        Prints the peak resident memory of each version of
+        the preprocessing on a synthetic inventory.
+
+        The inventory is written and each version runs in its
+        own process, as the peak memory of a process is kept by
+        the processes it starts. The time taken to build the count
+        pyramid from the daily counts is then printed.
+
+        Args:
+            rows: The number of trees in the inventory
+    '''
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'arbres.csv')
+        print(f'Writing a synthetic inventory of {rows} trees...')
+        subprocess.run(
+            [sys.executable, __file__, 'memory', '--rows', str(rows), '--write', path],
+            check=True)
+
+        print(f'{"Version":<36}{"Peak RSS (MB)":>16}{"Steps peak (MB)":>18}')
+        for variant, label in VARIANTS.items():
+            result = subprocess.run(
+                [sys.executable, __file__, 'memory', '--run', variant, '--path', path],
+                check=True, capture_output=True, text=True)
+            peak_rss, steps_peak = map(float, result.stdout.split())
+            print(f'{label:<36}{peak_rss:>16.1f}{steps_peak:>18.1f}')
+
+        daily_df = preprocess.read_daily_counts(path, preprocess.START_YEAR, preprocess.END_YEAR)
+        pyramid_time = time_call(lambda: preprocess.get_count_pyramid(daily_df), 1)
+        print(f'Count pyramid built in {pyramid_time:.1f} ms')
+
+
+def main():
+    '''
+        Runs the benchmark given on the command line.
+    '''
+    parser = argparse.ArgumentParser(description='Benchmarks the heatmap app.')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    memory_parser = subparsers.add_parser('memory', help='peak memory of the preprocessing')
+    memory_parser.add_argument('--rows', type=int, default=5000000)
+    memory_parser.add_argument('--run', choices=VARIANTS, help=argparse.SUPPRESS)
+    memory_parser.add_argument('--path', help=argparse.SUPPRESS)
+    memory_parser.add_argument('--write', help=argparse.SUPPRESS)
+
+    figure_parser = subparsers.add_parser('figure', help='build time of the heatmap')
+    figure_parser.add_argument('--repeat', type=int, default=20)
+
+    args = parser.parse_args()
+
+    if args.benchmark == 'figure':
+        benchmark_figure(args.repeat)
+    elif args.write is not None:
+        write_inventory(args.write, args.rows)
+    elif args.run is not None:
+        steps_peak = measure_run(args.run, args.path, preprocess.START_YEAR, preprocess.END_YEAR)
+        print(get_peak_rss(), steps_peak)
+    else:
+        benchmark_memory(args.rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,13 @@
 '''
     Contains some functions related to the creation of the heatmap.
 '''
-import plotly.express as px
+import plotly.graph_objects as go
 import hover_template
 
+from levels import LEVELS
 
-def get_figure(data):
+
+def get_figure(data, level=LEVELS['year']):
     '''
         Generates the heatmap from the given dataset.
 
@@ -13,29 +15,37 @@ def get_figure(data):
         and to display each year as an x-tick. The x and y axes should
         be titled "Year" and "Neighborhood". 
 
+        The heatmap trace is built directly from the values of the
+        dataframe, which avoids the argument processing of
+        Plotly Express for a matrix that is already in shape.
+
         Args:
             data: The data to display
+            level: The granularity of the periods in the columns
         Returns:
             The figure to be displayed.
     '''
-
-    
-    # the layout. Also don't forget to include the hover template.
-    fig = px.imshow(
-        data,
-        labels=dict(x="Year", y="Neighborhood", color="Trees"),
-        color_continuous_scale="Bluyl",
-        aspect="auto"
-    )
-
+    fig = go.Figure(go.Heatmap(
+        x=data.columns.to_numpy(),
+        y=data.index.to_numpy(dtype=object),
+        z=data.to_numpy(),
+        coloraxis='coloraxis',
+        hovertemplate=hover_template.get_heatmap_hover_template(level)
+    ))
+
+    # Same layout as the one of px.imshow, with the rows from top to bottom
     fig.update_layout(
+        coloraxis=dict(colorscale='Bluyl', colorbar_title_text='Trees'),
+        yaxis_autorange='reversed',
+        margin_t=60,
         dragmode=False,
-        xaxis_title="Year",
+        xaxis_title=level,
         yaxis_title="Neighborhood"
     )
 
-    fig.update_traces(
-        hovertemplate=hover_template.get_heatmap_hover_template()
-    )
+    # The labels of the months would be read as dates, and the
+    # clicked cells would then be reported as their first day
+    if level != LEVELS['year']:
+        fig.update_xaxes(type='category')
 
     return fig
@@ -3,7 +3,7 @@
 '''
 
 
-def get_heatmap_hover_template():
+def get_heatmap_hover_template(period_label='Year'):
     '''
         Sets the template for the hover tooltips in the heatmap.
 
@@ -13,12 +13,16 @@ def get_heatmap_hover_template():
 
         The labels are font 'Roboto Slab' and bold. The values
         are font 'Roboto' and regular weight.
+
+        Args:
+            period_label: The label of the period of the cells,
+                which is the granularity of the heatmap
     '''
    
     return (
         "<span style='font-family:Roboto Slab'><b>Neighborhood:</b></span> "
         "<span style='font-family:Roboto'>%{y}</span><br>"
-        "<span style='font-family:Roboto Slab'><b>Year:</b></span> "
+        f"<span style='font-family:Roboto Slab'><b>{period_label}:</b></span> "
         "<span style='font-family:Roboto'>%{x}</span><br>"
         "<span style='font-family:Roboto Slab'><b>Trees:</b></span> "
         "<span style='font-family:Roboto'>%{z}</span><extra></extra>"
@@ -0,0 +1,19 @@
+'''
+    This file contains some constants to help manage the
+    granularities at which the tree counts can be displayed.
+'''
+
+LEVELS = dict(day='Day', week='Week', month='Month', year='Year')
+LEVEL_TO_FREQ = {
+    LEVELS['day']: 'D',
+    LEVELS['week']: 'W',
+    LEVELS['month']: 'M',
+    LEVELS['year']: 'Y'
+}
+LEVEL_TO_TICKFORMAT = {
+    LEVELS['day']: '%d\n%b',
+    LEVELS['week']: '%d\n%b',
+    LEVELS['month']: '%b\n%Y'
+}
+HEATMAP_LEVELS = [LEVELS['year'], LEVELS['month']]
+LINE_CHART_LEVELS = [LEVELS['day'], LEVELS['week'], LEVELS['month']]
@@ -1,18 +1,35 @@
 '''
     Contains some functions related to the creation of the line chart.
 '''
+from functools import lru_cache
+
 import plotly.express as px
+from dash import Patch
+
 import hover_template
 
 from template import THEME
+from levels import LEVELS, LEVEL_TO_TICKFORMAT
 
+# The keys of the layout which the figures of this module can set,
+# besides the template
+LAYOUT_KEYS = [
+    'annotations', 'dragmode', 'legend', 'margin', 'paper_bgcolor',
+    'plot_bgcolor', 'shapes', 'title', 'xaxis', 'yaxis'
+]
 
+
+@lru_cache(maxsize=None)
 def get_empty_figure():
     '''
         Returns the figure to display when there is no data to show.
 
         The text to display is : 'No data to display. Select a cell
         in the heatmap for more information.
+
+        The figure is only built on the first call and returned
+        serialized, as it is sent to the browser. The same figure
+        is returned by every call, so it must not be modified.
     '''
 
     # Create an empty scatter plot
@@ -39,7 +56,7 @@ def get_empty_figure():
     # Add a rectangle behind the text for better readability
     add_rectangle_shape(fig)
 
-    return fig
+    return fig.to_plotly_json()
 
 
 def add_rectangle_shape(fig):
@@ -65,7 +82,7 @@ def add_rectangle_shape(fig):
     return fig
 
 
-def get_figure(line_data, arrond, year):
+def get_figure(line_data, arrond, year, level=LEVELS['day']):
     '''
         Generates the line chart using the given data.
 
@@ -82,7 +99,8 @@ def get_figure(line_data, arrond, year):
             line_data: The data to display in the
             line chart
             arrond: The selected neighborhood
-            year: The selected year
+            year: The selected year, or other period
+            level: The granularity of the data
         Returns:
             The figure to be displayed
     '''
@@ -109,7 +127,7 @@ def get_figure(line_data, arrond, year):
     fig.update_layout(
         xaxis_title=None,
         yaxis_title="Trees",
-        xaxis_tickformat="%d\n%b",  # Day as 2-digit number and abbreviated month
+        xaxis_tickformat=LEVEL_TO_TICKFORMAT[level],  # e.g. zero-padded day and abbreviated month
         dragmode=False  # Disable interactive dragging
     )
 
@@ -120,3 +138,29 @@ def get_figure(line_data, arrond, year):
     )
 
     return fig
+
+
+def get_patch(figure):
+    '''
+        Gets the partial update replacing the displayed line chart
+        by the given one.
+
+        The traces and the layout are replaced, except for the
+        template, which is the same for every line chart and is
+        therefore not sent again. The keys of the layout which are
+        not set by the given figure, such as the annotation and
+        rectangle of the empty figure, are removed.
+
+        Args:
+            figure: The serialized line chart to display
+        Returns:
+            The partial update of the displayed figure
+    '''
+    patched = Patch()
+    patched['data'] = figure['data']
+    for key in LAYOUT_KEYS:
+        if key in figure['layout']:
+            patched['layout'][key] = figure['layout'][key]
+        else:
+            del patched['layout'][key]
+    return patched
@@ -1,8 +1,92 @@
 '''
     Contains some functions to preprocess the data used in the visualisation.
+
+    None of these functions modify the dataframe they are given. Instead
+    of copying it, they return a shallow copy sharing its unchanged columns,
+    or a new dataframe when rows are selected or grouped.
 '''
+from functools import lru_cache
+
 import pandas as pd
 
+import cache
+from levels import LEVELS, LEVEL_TO_FREQ
+
+DATA_PATH = './assets/data/arbres.csv'
+START_YEAR = 2010
+END_YEAR = 2020
+CHUNK_SIZE = 500000
+
+
+@lru_cache(maxsize=None)
+def load_dataset(start=START_YEAR, end=END_YEAR):
+    '''
+        Loads the number of trees planted each day in each
+        neighborhood during the given years, using
+        'read_daily_counts'.
+
+        The source file is only parsed on the first call:
+        every later call in the same process returns the
+        same dataframe, which must therefore not be modified.
+        The result is also cached on disk until the source
+        file changes, so later processes don't parse it.
+
+        Args:
+            start: The starting year (inclusive)
+            end: The ending year (inclusive)
+        Returns:
+            The shared daily counts dataframe.
+    '''
+    return cache.cached_frame(
+        f'arbres-daily-{start}-{end}',
+        DATA_PATH,
+        lambda: read_daily_counts(DATA_PATH, start, end))
+
+
+def read_daily_counts(path, start, end, chunksize=CHUNK_SIZE):
+    '''
+        Streams the tree inventory by chunks, only reading
+        the planting date and the neighborhood of each tree,
+        and folds each chunk into the number of trees planted
+        each day in each neighborhood during the given years.
+
+        The memory used is bounded by the size of a chunk and
+        the number of (neighborhood, day) pairs, whatever
+        the size of the inventory.
+
+        Args:
+            path: The path to the .csv file of the inventory
+            start: The starting year (inclusive)
+            end: The ending year (inclusive)
+            chunksize: The number of rows to read at a time
+        Returns:
+            The dataframe with columns 'Arrond_Nom',
+            'Year', 'Date_Plantation' and 'Counts'.
+    '''
+    chunks = pd.read_csv(
+        path,
+        usecols=["Arrond_Nom", "Date_Plantation"],
+        dtype={"Arrond_Nom": "category"},
+        chunksize=chunksize
+    )
+
+    daily_df = None
+    for chunk in chunks:
+        chunk = convert_dates(chunk)
+        chunk = filter_years(chunk, start, end)
+        chunk_counts = summarize_daily_counts(chunk)
+
+        # Add the counts of the chunk to those of the previous chunks
+        if daily_df is not None:
+            chunk_counts = pd.concat([daily_df, chunk_counts], ignore_index=True)
+            chunk_counts = summarize_daily_counts(chunk_counts)
+        daily_df = chunk_counts
+
+    daily_df["Arrond_Nom"] = daily_df["Arrond_Nom"].astype("category")
+    daily_df["Year"] = daily_df["Year"].astype(int)
+
+    return daily_df
+
 
 def convert_dates(dataframe):
     '''
@@ -14,7 +98,8 @@ def convert_dates(dataframe):
             The processed dataframe with datetime-formatted dates.
     '''
 
-    dataframe = dataframe.copy()
+    # Only replace the date column of a shallow copy, sharing the other columns
+    dataframe = dataframe.copy(deep=False)
     
     # Convert the "Date_Plantation" column to datetime format, coercing errors
     dataframe["Date_Plantation"] = pd.to_datetime(dataframe["Date_Plantation"], errors="coerce")
@@ -27,6 +112,9 @@ def filter_years(dataframe, start, end):
         Filters the elements of the dataframe by date, making sure
         they fall in the desired range.
 
+        The year of each date is computed once and kept in
+        a new column 'Year' of the filtered dataframe.
+
         Args:
             dataframe: The dataframe to process
             start: The starting year (inclusive)
@@ -35,13 +123,42 @@ def filter_years(dataframe, start, end):
             The dataframe filtered by date.
     '''
     
-    dataframe = dataframe.copy()
+    # Add the column to a shallow copy, sharing the other columns
+    dataframe = dataframe.copy(deep=False)
     
     # Extract year from the date and store in a new column
     dataframe["Year"] = dataframe["Date_Plantation"].dt.year
     
-    # Filter rows where year is within the given range
-    return dataframe[(dataframe["Year"] >= start) & (dataframe["Year"] <= end)]
+    # Filter rows where year is within the given range, which only copies
+    # the selected rows
+    return dataframe[dataframe["Year"].between(start, end)]
+
+
+def summarize_daily_counts(dataframe):
+    '''
+        Groups the data by neighborhood and day,
+        summing the number of trees planted in each
+        neighborhood each day.
+
+        The year computed by 'filter_years' is kept
+        as is rather than being computed again.
+
+        Args:
+            dataframe: The dataframe to process, as returned by
+            'filter_years', with either one row per tree or a
+            column 'Counts' containing the number of trees of each row
+        Returns:
+            The processed dataframe with column 'Counts'
+            containing the counts of planted
+            trees for each neighborhood each day.
+    '''
+    grouped = dataframe.groupby(
+        ["Arrond_Nom", "Year", "Date_Plantation"], observed=True)
+
+    # Sum the existing counts, or count the number of entries
+    if "Counts" in dataframe:
+        return grouped["Counts"].sum().reset_index()
+    return grouped.size().reset_index(name="Counts")
 
 
 def summarize_yearly_counts(dataframe):
@@ -51,25 +168,80 @@ def summarize_yearly_counts(dataframe):
         each year.
 
         Args:
-            dataframe: The dataframe to process
+            dataframe: The daily counts to process, as returned
+            by 'read_daily_counts'
         Returns:
             The processed dataframe with column 'Counts'
             containing the counts of planted
             trees for each neighborhood each year.
     '''
-    
-    dataframe = dataframe.copy()
-    
-    # Extract the year from the planting date
-    dataframe["Year"] = dataframe["Date_Plantation"].dt.year
-    
-    # Group by neighborhood and year, then count the number of entries
-    grouped = dataframe.groupby(["Arrond_Nom", "Year"]).size().reset_index(name="Counts")
+    # Group by neighborhood and year, then sum the daily counts
+    grouped = (
+        dataframe
+        .groupby(["Arrond_Nom", "Year"], observed=True)["Counts"]
+        .sum()
+        .reset_index()
+    )
     
     return grouped
 
 
-def restructure_df(yearly_df):
+def get_count_pyramid(dataframe):
+    '''
+        Aggregates the daily counts of each neighborhood at
+        every granularity in LEVELS, from days to years.
+
+        Each level is sorted by neighborhood and period, so the
+        counts of a neighborhood during a range of periods are
+        read without scanning the whole level.
+
+        Args:
+            dataframe: The daily counts to process, as returned
+            by 'read_daily_counts'
+        Returns:
+            A dictionary mapping each level to the series of
+            counts indexed by neighborhood and period.
+    '''
+    pyramid = {}
+    for level, freq in LEVEL_TO_FREQ.items():
+        periods = dataframe["Date_Plantation"].dt.to_period(freq).rename("Period")
+        pyramid[level] = (
+            dataframe["Counts"]
+            .groupby([dataframe["Arrond_Nom"], periods], observed=True)
+            .sum()
+            .sort_index()
+        )
+    return pyramid
+
+
+def get_level_counts(pyramid, level):
+    '''
+        Gets the counts of the given level of the pyramid,
+        in the format returned by 'summarize_yearly_counts'.
+
+        The periods are in a column named after the level.
+        Years are labelled by their number, while the other
+        periods are labelled by their string representation.
+
+        Args:
+            pyramid: The pyramid returned by 'get_count_pyramid'
+            level: The desired level
+        Returns:
+            The dataframe with columns 'Arrond_Nom', the
+            level and 'Counts'.
+    '''
+    counts = pyramid[level].rename("Counts").reset_index()
+
+    periods = counts.pop("Period")
+    if level == LEVELS['year']:
+        counts.insert(1, level, periods.dt.year)
+    else:
+        counts.insert(1, level, periods.astype(str))
+
+    return counts
+
+
+def restructure_df(yearly_df, columns="Year"):
     '''
         Restructures the dataframe into a format easier
         to be displayed as a heatmap.
@@ -84,11 +256,13 @@ def restructure_df(yearly_df):
 
         Args:
             yearly_df: The dataframe to process
+            columns: The column containing the periods to
+            use as columns, the years by default
         Returns:
             The restructured dataframe
     '''
-    # Pivot the table to make neighborhoods the index and years the columns
-    heatmap_df = yearly_df.pivot(index="Arrond_Nom", columns="Year", values="Counts")
+    # Pivot the table to make neighborhoods the index and periods the columns
+    heatmap_df = yearly_df.pivot(index="Arrond_Nom", columns=columns, values="Counts")
     
     # Replace missing values with 0 and ensure data is integer type
     heatmap_df = heatmap_df.fillna(0).astype(int)
@@ -96,65 +270,73 @@ def restructure_df(yearly_df):
     return heatmap_df
 
 
-def get_daily_info(dataframe, arrond, year):
+def get_period_info(pyramid, level, arrond, period):
     '''
-        From the given dataframe, gets
-        the daily amount of planted trees
-        in the given neighborhood and year.
+        From the given pyramid, gets the amount of
+        planted trees per period of the given level
+        in the given neighborhood during the given period.
+
+        The counts cover every period between the first
+        and last plantation, periods without plantations
+        having a count of zero.
 
         Args:
-            dataframe: The dataframe to process
+            pyramid: The pyramid returned by 'get_count_pyramid'
+            level: The granularity of the counts
             arrond: The desired neighborhood
-            year: The desired year
+            period: The desired period, as a pandas Period
         Returns:
-            The daily tree count data for that
-            neighborhood and year.
+            The tree count data for that neighborhood
+            and period, with the start of each period
+            in column 'Date_Plantation'.
     '''
-   
-    dataframe = dataframe.copy()
-    
-    # Extract year from the planting date
-    dataframe["Year"] = dataframe["Date_Plantation"].dt.year
+    freq = LEVEL_TO_FREQ[level]
 
-    # Filter by the selected neighborhood and year
-    filtered_df = dataframe[
-        (dataframe["Arrond_Nom"] == arrond) &
-        (dataframe["Year"] == year)
-    ]
+    # Read the slice of the sorted counts of the neighborhood
+    # covering the desired period
+    try:
+        counts = pyramid[level].loc[arrond]
+        counts = counts.loc[period.asfreq(freq, 'start'):period.asfreq(freq, 'end')]
+    except KeyError:
+        counts = None
 
     # Return empty result if no data found
-    if filtered_df.empty:
+    if counts is None or counts.empty:
         return pd.DataFrame(columns=["Date_Plantation", "Counts"])
 
-    # Get the full date range between min and max planting date
-    min_date = filtered_df["Date_Plantation"].min()
-    max_date = filtered_df["Date_Plantation"].max()
-    full_range = pd.date_range(start=min_date, end=max_date)
-    full_df = pd.DataFrame({"Date_Plantation": full_range})
-
-    # Count the number of trees planted per day
-    daily_counts = (
-        filtered_df
-        .groupby("Date_Plantation")
-        .size()
-        .reset_index(name="Counts")
-    )
+    # Fill the periods without plantations with zeros
+    full_range = pd.period_range(
+        start=counts.index.min(), end=counts.index.max(), freq=freq)
+    counts = counts.reindex(full_range, fill_value=0)
+
+    return pd.DataFrame({
+        "Date_Plantation": full_range.to_timestamp(),
+        "Counts": counts.to_numpy(dtype=int)
+    })
 
-    # Merge full date range with the actual daily counts
-    merged_df = pd.merge(full_df, daily_counts, on="Date_Plantation", how="left")
-    
-    # Fill missing counts with 0 and convert to integer
-    merged_df["Counts"] = merged_df["Counts"].fillna(0).astype(int)
 
-    return merged_df
+def get_daily_info(pyramid, arrond, year):
+    '''
+        From the given pyramid, gets
+        the daily amount of planted trees
+        in the given neighborhood and year.
+
+        Args:
+            pyramid: The pyramid returned by 'get_count_pyramid'
+            arrond: The desired neighborhood
+            year: The desired year
+        Returns:
+            The daily tree count data for that
+            neighborhood and year.
+    '''
+    return get_period_info(pyramid, LEVELS['day'], arrond, pd.Period(str(year)))
 
 
-# === Test Calls ===
-df = pd.read_csv("./assets/data/arbres.csv")  # Load data from CSV
-df = convert_dates(df)                        # Convert date columns to datetime
-df = filter_years(df, 2010, 2020)             # Filter rows between 2010 and 2020
-summary = summarize_yearly_counts(df)         # Summarize by year and neighborhood
-heatmap_df = restructure_df(summary)          # Restructure to heatmap format
-print(heatmap_df.head())                      # Print preview of heatmap data
-daily = get_daily_info(df, "Le Sud-Ouest", 2017)  # Get daily counts for one area and year
-print(daily.head())                           # Print preview of daily data
+if __name__ == "__main__":
+    df = load_dataset()                           # Load the shared, filtered dataset
+    summary = summarize_yearly_counts(df)         # Summarize by year and neighborhood
+    heatmap_df = restructure_df(summary)          # Restructure to heatmap format
+    print(heatmap_df.head())                      # Print preview of heatmap data
+    pyramid = get_count_pyramid(df)               # Aggregate counts at every granularity
+    daily = get_daily_info(pyramid, "Le Sud-Ouest", 2017)  # Get daily counts for one area and year
+    print(daily.head())                           # Print preview of daily data